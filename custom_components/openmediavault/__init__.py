@@ -1,161 +1,450 @@
+import contextlib
 import logging
-import aiohttp
-import async_timeout
+import time
 from datetime import timedelta
+from functools import partial
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from .const import DOMAIN, PLATFORMS, DEFAULT_SCAN_INTERVAL
-from .omv import merge_disks_with_filesystems
+from homeassistant.util import dt as dt_util
+from .adaptive import AdaptiveInterval, change_activity
+from .api import OMVClient
+from .arrays import build_arrays
+from .breaker import STATE_CLOSED, CircuitBreaker, async_probe
+from .const import (
+    DOMAIN,
+    PLATFORMS,
+    CONF_ADAPTIVE_INTERVAL,
+    CONF_ADAPTIVE_MAX_INTERVAL,
+    CONF_ADAPTIVE_MIN_INTERVAL,
+    CONF_PAGE_SIZE,
+    CONF_SMART_SCAN_INTERVAL,
+    CONF_SPINDOWN_AWARE,
+    CONF_TEMPERATURE_THRESHOLD,
+    CONF_USAGE_THRESHOLD,
+    DEFAULT_ADAPTIVE_MAX_INTERVAL,
+    DEFAULT_ADAPTIVE_MIN_INTERVAL,
+    DEFAULT_SMART_SCAN_INTERVAL,
+    DEFAULT_TEMPERATURE_THRESHOLD,
+    DEFAULT_USAGE_THRESHOLD,
+    DUE_SLACK,
+    STORAGE_VERSION,
+    STORE_SAVE_DELAY,
+)
+from .forecast import UsageForecaster
+from .omv import DiskMerger, OMVSnapshot, SpindownTracker
+from .scheduler import OMVScheduler, async_get_scheduler
+from .services import SERVICES
+from .session import async_acquire_session, async_release_session
+from .smart import SmartCollector
+from .stats import OMVStats
+from .throughput import CounterRates, build_interfaces
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Set up OMV integration from a config entry."""
-    session = aiohttp.ClientSession()
-    coordinator = OMVCoordinator(hass, session, entry.data)
-    await coordinator.async_config_entry_first_refresh()
+    started = time.perf_counter()
+    session = async_acquire_session(hass)
+    scheduler = async_get_scheduler(hass)
+    scheduler.register(entry.entry_id)
+    try:
+        coordinator = OMVCoordinator(
+            hass,
+            session,
+            entry.data,
+            entry.options,
+            store=_entry_store(hass, entry),
+            scheduler=scheduler,
+        )
+        # Démarrage à chaud : les entités sont créées depuis le cache et le
+        # premier rafraîchissement part en tâche de fond.
+        if not await coordinator.async_restore_cache():
+            await coordinator.async_config_entry_first_refresh()
+    except Exception:
+        scheduler.unregister(entry.entry_id)
+        await async_release_session(hass)
+        raise
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
+    coordinator.setup_seconds = time.perf_counter() - started
+    if coordinator.restored_from_cache:
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {entry.entry_id}"
+        )
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry):
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Unload an OMV config entry and release its HTTP session."""
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id, None)
+        if coordinator is not None:
+            # Écriture différée en attente : faite maintenant, pas après le rechargement
+            await coordinator.async_save_cache()
+        async_get_scheduler(hass).unregister(entry.entry_id)
+        await async_release_session(hass)
+    return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Drop the cached snapshot of a removed entry."""
+    await _entry_store(hass, entry).async_remove()
+
+
+def _entry_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}")
+
+
+class RefreshTier:
+    """One RPC refreshed on its own interval, keeping its latest result."""
+
+    def __init__(self, name, interval: timedelta, fetch):
+        self.name = name
+        self.interval = interval
+        self.fetch = fetch
+        self.result = None
+        self.fetched_at: float | None = None
+
+    def is_due(self, now: float, slack: float, interval: timedelta | None = None) -> bool:
+        if self.fetched_at is None:
+            return True
+        interval = interval or self.interval
+        return now - self.fetched_at >= interval.total_seconds() - slack
+
+
 class OMVCoordinator(DataUpdateCoordinator):
     """Manages communication and updates from OpenMediaVault."""
 
-    def __init__(self, hass, session, config):
+    def __init__(
+        self,
+        hass,
+        session,
+        config,
+        options=None,
+        store: Store | None = None,
+        scheduler: OMVScheduler | None = None,
+    ):
         """Initialize the coordinator."""
+        options = options or {}
+        self.store = store
+        self.scheduler = scheduler
+        self.restored_from_cache = False
+        self.cache_saved_at: str | None = None
+        self.setup_seconds: float | None = None
+        self.session = session
+        self.host = config["host"]
+        self.stats = OMVStats()
+        self.client = OMVClient(
+            session,
+            self.host,
+            config["username"],
+            config["password"],
+            self.stats,
+            page_size=options.get(CONF_PAGE_SIZE) or None,
+        )
+        self.tiers = {
+            name: RefreshTier(
+                name,
+                _interval_option(options, service.interval_option, service.default_interval),
+                partial(service.fetch, self.client),
+            )
+            for name, service in SERVICES.items()
+        }
+        # Niveau lent hors du poll principal : jamais dans self.tiers
+        self.smart = SmartCollector(self.client)
+        self.smart_tier = RefreshTier(
+            "smart",
+            _interval_option(options, CONF_SMART_SCAN_INTERVAL, DEFAULT_SMART_SCAN_INTERVAL),
+            self.smart.async_collect,
+        )
+        self._smart_task = None
+        self.forecast = UsageForecaster()
+        # Débits dérivés des compteurs cumulés, par niveau concerné
+        self.rates = {"network": CounterRates()}
+        self._merger = DiskMerger()
+        self.spindown = SpindownTracker() if options.get(CONF_SPINDOWN_AWARE) else None
+        self.temperature_threshold = options.get(
+            CONF_TEMPERATURE_THRESHOLD, DEFAULT_TEMPERATURE_THRESHOLD
+        )
+        self.usage_threshold = options.get(CONF_USAGE_THRESHOLD, DEFAULT_USAGE_THRESHOLD)
+        # Le coordinator tourne au rythme du niveau le plus rapide
+        self.tick_interval = min(tier.interval for tier in self.tiers.values())
+        self.breaker = CircuitBreaker(self.tick_interval)
+        self.adaptive = None
+        if options.get(CONF_ADAPTIVE_INTERVAL):
+            self.adaptive = AdaptiveInterval(
+                self.tick_interval,
+                _interval_option(
+                    options, CONF_ADAPTIVE_MIN_INTERVAL, DEFAULT_ADAPTIVE_MIN_INTERVAL
+                ),
+                _interval_option(
+                    options, CONF_ADAPTIVE_MAX_INTERVAL, DEFAULT_ADAPTIVE_MAX_INTERVAL
+                ),
+            )
+        self._fetch_seconds: float | None = None
+        self._save_queued_at: float | None = None
         super().__init__(
             hass,
             _LOGGER,
             name="OpenMediaVault",
-            update_interval=DEFAULT_SCAN_INTERVAL,
+            update_interval=self.tick_interval,
+            always_update=False,
         )
-        self.session = session
-        self.host = config["host"]
-        self.username = config["username"]
-        self.password = config["password"]
-        # Tu peux changer rpc.php → webapi/ si besoin
-        self.base_url = f"http://{self.host}/rpc.php"
-        self.token = None
-        self.cookie_name = None
 
     async def _async_update_data(self):
-        """Fetch data from OMV."""
+        """Fetch the tiers that are due and merge their latest results."""
         try:
-            async with async_timeout.timeout(10):
-                if not self.token:
-                    await self._login()
-                try:
-                    disks = await self._get_disks()
-                    filesystems = await self._get_filesystems()
-                except Exception:
-                    # Si la session a expiré, on réessaie une fois
-                    _LOGGER.warning("Session OMV expirée, reconnexion...")
-                    await self._login()
-                    disks = await self._get_disks()
-                    filesystems = await self._get_filesystems()
-
-                merged = merge_disks_with_filesystems(disks, filesystems)
-                _LOGGER.debug("OMV data retrieved: %s", merged)
-                return merged
-        except Exception as err:
-            raise UpdateFailed(f"Erreur de mise à jour : {err}")
-
-    async def _login(self):
-        """Authenticate to OMV."""
-        headers = {"X-Requested-With": "XMLHttpRequest"}
-        payload = {
-            "service": "Session",
-            "method": "login",
-            "params": {"username": self.username, "password": self.password},
-        }
+            with self.stats.measure("refresh"):
+                snapshot = await self._async_refresh_tiers()
+            # Tick sans appel : ni activité ni latence à observer
+            if self.adaptive is not None and self._fetch_seconds is not None:
+                self.adaptive.observe(
+                    change_activity(
+                        self.data, snapshot, self.temperature_threshold, self.usage_threshold
+                    ),
+                    self._fetch_seconds,
+                )
+        finally:
+            self.update_interval = self._next_interval()
+        self._async_schedule_smart(snapshot)
+        return snapshot
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify entities, timing the dispatch."""
+        with self.stats.measure("dispatch"):
+            super().async_update_listeners()
 
-        async with self.session.post(self.base_url, json=payload, headers=headers) as resp:
-            data = await resp.json()
-            response = data.get("response", {})
+    async def _async_refresh_tiers(self):
+        if self.breaker.is_open:
+            # Circuit ouvert : simple sonde TCP au lieu d'un login + fetch
+            if not await async_probe(self.host):
+                self.breaker.record_failure()
+                raise UpdateFailed(
+                    f"Hôte OMV injoignable, nouvel essai dans {self.breaker.backoff}"
+                )
+            self.breaker.probe_succeeded()
 
-            # Vérifie que l'auth a réussi
-            if not response or not response.get("authenticated", False):
-                raise Exception("Authentification OMV échouée")
+        now = time.monotonic()
+        # Un niveau n'est dû qu'une fois son intervalle écoulé : jamais plus
+        # souvent que configuré, quitte à attendre le tick suivant ;
+        # l'intervalle adaptatif étire ou resserre chaque niveau dans ses bornes
+        due = [
+            tier
+            for tier in self.tiers.values()
+            if tier.is_due(now, DUE_SLACK, self._tier_interval(tier))
+        ]
+        self._fetch_seconds = None
+        if not due and self.data is not None:
+            # Rafraîchissement demandé sans niveau dû : ni appel ni fusion
+            return self.data
+        # Un échantillon d'occupation par lecture des systèmes de fichiers
+        sampled_at = time.time() if self.tiers["filesystems"] in due else None
+        if due:
+            try:
+                async with self._refresh_slot():
+                    started = time.perf_counter()
+                    results = await self.client.fetch_many(
+                        ((tier.name, tier.fetch) for tier in due), return_exceptions=True
+                    )
+                    self._fetch_seconds = time.perf_counter() - started
+            except Exception as err:
+                self.breaker.record_failure()
+                raise UpdateFailed(f"Erreur de mise à jour : {err}")
+            # Seuls disques et systèmes de fichiers font échouer le poll
+            for tier in due:
+                error = results[tier.name]
+                if SERVICES[tier.name].critical and isinstance(error, BaseException):
+                    self.breaker.record_failure()
+                    raise UpdateFailed(f"Erreur de mise à jour : {tier.name}: {error!r}")
+            self.breaker.record_success()
+            changed = False
+            for tier in due:
+                tier.fetched_at = now
+                if isinstance(results[tier.name], BaseException):
+                    # Niveau secondaire en échec : dernier résultat conservé,
+                    # nouvel essai à sa prochaine échéance
+                    _LOGGER.debug(
+                        "Lecture OMV %s impossible : %r", tier.name, results[tier.name]
+                    )
+                    continue
+                # Même objet renvoyé par le client : contenu identique
+                changed |= results[tier.name] is not tier.result
+                tier.result = results[tier.name]
+                rates = self.rates.get(tier.name)
+                if rates is not None:
+                    # Compteurs figés : le débit retombe à zéro, c'est un changement
+                    changed |= rates.sample(SERVICES[tier.name].parse(tier.result), now)
+            if not changed and self.data is not None:
+                # Rien n'a changé : même instantané, aucun listener notifié,
+                # sauf si la prévision de remplissage a bougé
+                if sampled_at is None or not self.forecast.apply(self.data, sampled_at):
+                    return self.data
+                self._async_schedule_save()
+                return OMVSnapshot(
+                    self.data.disks,
+                    self.data.system,
+                    self.data.arrays,
+                    self.data.interfaces,
+                )
 
-            # Cherche un cookie de session
-            cookies = resp.cookies
-            session_cookie = (
-                cookies.get("OPENMEDIAVAULT-SESSIONID")
-                or cookies.get("PHPSESSID")
+        snapshot = self._build_snapshot(sampled_at)
+        self._async_schedule_save()
+        return snapshot
+
+    @callback
+    def _async_schedule_smart(self, snapshot: OMVSnapshot) -> None:
+        """Start a SMART read in the background when its tier is due."""
+        if self._smart_task is not None:
+            return
+        if not self.smart_tier.is_due(
+            time.monotonic(), 0
+        ) and not self.smart.has_unchecked(snapshot):
+            return
+        target = self._async_refresh_smart(snapshot)
+        name = f"{DOMAIN} SMART {self.host}"
+        if self.config_entry is not None:
+            self._smart_task = self.config_entry.async_create_background_task(
+                self.hass, target, name
             )
+        else:
+            self._smart_task = self.hass.async_create_background_task(target, name)
 
-            if not session_cookie:
-                _LOGGER.error("Cookies reçus : %s", cookies)
-                raise Exception("Aucun cookie de session retourné")
+    async def _async_refresh_smart(self, snapshot: OMVSnapshot) -> None:
+        started = time.monotonic()
+        try:
+            changed = await self.smart_tier.fetch(snapshot)
+        except Exception as err:  # noqa: BLE001
+            # Un échec SMART ne doit pas rendre les disques indisponibles ; le
+            # prochain essai attend l'échéance du niveau, pas le tick suivant
+            _LOGGER.warning("Lecture SMART OMV impossible : %s", err)
+            self.smart.mark_checked(snapshot)
+            return
+        finally:
+            self.smart_tier.fetched_at = started
+            self._smart_task = None
 
-            self.token = session_cookie.value
-            self.cookie_name = session_cookie.key
-            _LOGGER.info("Connexion OMV réussie (%s, cookie=%s)", self.host, self.cookie_name)
+        if changed and self.data is not None:
+            # Mise à jour en place : inutile de refusionner disques et FS
+            self.smart.apply(self.data)
+            self.async_update_listeners()
+            self._async_schedule_save()
 
-    async def _get_disks(self):
-        """Retrieve disks status from OMV."""
-        if not self.token or not self.cookie_name:
-            raise Exception("Session OMV non initialisée")
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Queue a cache write, at most once per ``STORE_SAVE_DELAY``.
 
-        headers = {
-            "X-Requested-With": "XMLHttpRequest",
-            "Cookie": f"{self.cookie_name}={self.token}",
-        }
+        The payload is built when the write happens, so it holds the
+        latest snapshot whatever triggered it.
+        """
+        if self.store is None:
+            return
+        now = time.monotonic()
+        if self._save_queued_at is not None and now - self._save_queued_at < STORE_SAVE_DELAY:
+            return
+        self._save_queued_at = now
+        self.store.async_delay_save(self._cache_payload, STORE_SAVE_DELAY)
 
-        payload = {
-            "service": "DiskMgmt",
-            "method": "getList",
-            "params": {
-                "start": 0,
-                "limit": -1,
-                "sortfield": "",
-                "sortdir": "asc"
-            }
-        }
+    async def async_save_cache(self) -> None:
+        """Write the cache now, replacing any pending delayed write."""
+        if self.store is not None and self.data is not None:
+            await self.store.async_save(self._cache_payload())
+            self._save_queued_at = None
 
-        async with self.session.post(self.base_url, json=payload, headers=headers) as resp:
-            data = await resp.json()
+    def _refresh_slot(self):
+        """Limit how many OMV hosts are polled at the same time."""
+        if self.scheduler is None:
+            return contextlib.nullcontext()
+        return self.scheduler.semaphore
 
-            # OMV 7 retourne les disques dans data["response"]["data"]
-            response = data.get("response") or {}
-            disks = response.get("data") or response.get("response") or []
+    def _tier_interval(self, tier: RefreshTier) -> timedelta:
+        if self.adaptive is None:
+            return tier.interval
+        return self.adaptive.stretch(tier.interval)
 
-            if not isinstance(disks, list):
-                raise Exception(f"Réponse invalide OMV : {data}")
+    def _next_interval(self) -> timedelta:
+        """Delay before the next tick, shifted onto this entry's phase."""
+        if self.breaker.state != STATE_CLOSED:
+            return self.breaker.backoff
+        tick = self.adaptive.interval if self.adaptive is not None else self.tick_interval
+        if self.scheduler is None:
+            return tick
+        key = self.config_entry.entry_id if self.config_entry else self.host
+        return self.scheduler.align(key, tick, self.hass.loop.time())
 
-            return disks
+    async def async_restore_cache(self) -> bool:
+        """Publish the last saved snapshot, if any, without contacting OMV."""
+        if self.store is None:
+            return False
+        cached = await self.store.async_load()
+        if not cached or not cached.get("tiers"):
+            return False
 
-    async def _get_filesystems(self):
-        """Retrieve filesystem stats for each disk."""
-        if not self.token or not self.cookie_name:
-            raise Exception("Session OMV non initialisée")
+        for name, result in cached["tiers"].items():
+            if name in self.tiers:
+                # fetched_at reste à None : le niveau sera rafraîchi au plus tôt
+                self.tiers[name].result = result
+        self.smart.restore(cached.get("smart"))
+        self.forecast.restore(cached.get("forecast"))
+        cookie = cached.get("cookie") or {}
+        if cookie.get("name") and cookie.get("token"):
+            self.client.auth.restore(cookie["name"], cookie["token"])
 
-        headers = {
-            "X-Requested-With": "XMLHttpRequest",
-            "Cookie": f"{self.cookie_name}={self.token}",
-        }
+        self.cache_saved_at = cached.get("saved_at")
+        self.restored_from_cache = True
+        self.data = self._build_snapshot()
+        return True
 
-        payload = {
-            "service": "FileSystemMgmt",
-            "method": "getList",
-            "params": {
-                "start": 0,
-                "limit": -1,
-                "sortfield": "",
-                "sortdir": "asc",
+    def _build_snapshot(self, sampled_at: float | None = None) -> OMVSnapshot:
+        with self.stats.measure("merge"):
+            values = {
+                name: SERVICES[name].parse(tier.result) for name, tier in self.tiers.items()
+            }
+            merged = self._merger.merge(values["disks"], values["filesystems"])
+            if self.spindown is not None:
+                self.spindown.apply(merged)
+            self.smart.apply(merged)
+            self.forecast.apply(merged, sampled_at)
+            arrays = build_arrays(
+                values["raid"], values["pools"], merged, self._merger.index
+            )
+            snapshot = OMVSnapshot(
+                merged,
+                values["system"],
+                arrays,
+                build_interfaces(self.rates["network"].rates),
+            )
+        _LOGGER.debug("OMV data retrieved: %s", merged)
+        return snapshot
+
+    def _cache_payload(self):
+        return {
+            "saved_at": dt_util.utcnow().isoformat(),
+            "tiers": {
+                name: tier.result
+                for name, tier in self.tiers.items()
+                if tier.result is not None
             },
+            "smart": self.smart.as_dict(),
+            "forecast": self.forecast.as_dict(),
+            "cookie": {"name": self.client.auth.cookie_name, "token": self.client.auth.token},
         }
 
-        async with self.session.post(self.base_url, json=payload, headers=headers) as resp:
-            data = await resp.json()
-            response = data.get("response") or {}
-            filesystems = response.get("data") or response.get("response") or []
-
-            if not isinstance(filesystems, list):
-                raise Exception(f"Réponse invalide OMV (filesystem): {data}")
 
-            return filesystems
+def _interval_option(options, key, default: timedelta) -> timedelta:
+    seconds = options.get(key)
+    if not seconds:
+        return default
+    return timedelta(seconds=int(seconds))
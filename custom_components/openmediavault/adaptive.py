@@ -0,0 +1,146 @@
+"""Adjust the polling interval to how fast values change and OMV answers."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from .const import (
+    ADAPTIVE_LATENCY_ALPHA,
+    ADAPTIVE_MIN_SLOW_LATENCY,
+    ADAPTIVE_SLOW_LATENCY_RATIO,
+    ADAPTIVE_STABLE_POLLS,
+)
+from .omv import OMVSnapshot
+
+REASON_INITIAL = "initial"
+REASON_CHANGING = "values_changing"
+REASON_STABLE = "values_stable"
+REASON_SLOW = "slow_response"
+REASON_STEADY = "steady"
+
+
+def change_activity(
+    previous: Optional[OMVSnapshot],
+    snapshot: OMVSnapshot,
+    temperature_threshold: float,
+    usage_threshold: float,
+) -> float:
+    """Largest change between two snapshots, in units of the thresholds.
+
+    1.0 means a disk moved by exactly one significance threshold (the ones
+    that decide whether a state is written) since the previous poll.
+    """
+    if previous is None or previous is snapshot:
+        return 0.0
+    activity = 0.0
+    for disk in snapshot:
+        old = previous.lookup(disk.hardware_id)
+        if old is None or old is disk:
+            # Disque nouveau, ou enregistrement réutilisé tel quel
+            continue
+        activity = max(
+            activity,
+            _scaled(old.temperature, disk.temperature, temperature_threshold),
+            _scaled(old.usage_percent, disk.usage_percent, usage_threshold),
+        )
+    return activity
+
+
+class AdaptiveInterval:
+    """Scale the configured intervals between two bounds.
+
+    The scale halves when a poll sees a significant change, doubles when
+    OMV answers much slower than usual, and grows by a quarter after a few
+    polls without any change.
+    """
+
+    def __init__(self, base: timedelta, minimum: timedelta, maximum: timedelta):
+        self.base = base
+        self.minimum = minimum
+        self.maximum = maximum
+        self.min_scale = min(minimum / base, 1.0)
+        self.max_scale = max(maximum / base, 1.0)
+        self.scale = 1.0
+        self.reason = REASON_INITIAL
+        self.activity = 0.0
+        self.latency: Optional[float] = None
+        self.baseline_latency: Optional[float] = None
+        self._stable_polls = 0
+
+    @property
+    def interval(self) -> timedelta:
+        return self.stretch(self.base)
+
+    def stretch(self, interval: timedelta) -> timedelta:
+        """Scale ``interval``, clamped to the bounds it does not already exceed.
+
+        A tier configured slower than the maximum keeps its own interval
+        instead of being stretched further.
+        """
+        scaled = interval * self.scale
+        return min(max(scaled, min(interval, self.minimum)), max(interval, self.maximum))
+
+    def observe(self, activity: float, latency: Optional[float]) -> None:
+        """Update the scale after a successful poll."""
+        self.activity = activity
+        slow = latency is not None and self._is_slow(latency)
+        if latency is not None:
+            self._track_latency(latency, slow)
+
+        if slow:
+            self._stable_polls = 0
+            self._rescale(2.0, REASON_SLOW)
+        elif activity >= 1.0:
+            self._stable_polls = 0
+            self._rescale(0.5, REASON_CHANGING)
+        else:
+            self._stable_polls += 1
+            if self._stable_polls >= ADAPTIVE_STABLE_POLLS:
+                self._stable_polls = 0
+                self._rescale(1.25, REASON_STABLE)
+            else:
+                self.reason = REASON_STEADY
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval.total_seconds(),
+            "scale": round(self.scale, 3),
+            "min_interval": (self.base * self.min_scale).total_seconds(),
+            "max_interval": (self.base * self.max_scale).total_seconds(),
+            "reason": self.reason,
+            "activity": round(self.activity, 3),
+            "latency": self.latency,
+            "baseline_latency": (
+                round(self.baseline_latency, 4) if self.baseline_latency is not None else None
+            ),
+        }
+
+    def _is_slow(self, latency: float) -> bool:
+        if self.baseline_latency is None:
+            return False
+        return latency >= max(
+            self.baseline_latency * ADAPTIVE_SLOW_LATENCY_RATIO, ADAPTIVE_MIN_SLOW_LATENCY
+        )
+
+    def _track_latency(self, latency: float, slow: bool) -> None:
+        self.latency = round(latency, 4)
+        if self.baseline_latency is None:
+            self.baseline_latency = latency
+        elif not slow:
+            # Les réponses lentes ne déplacent pas la référence
+            self.baseline_latency += ADAPTIVE_LATENCY_ALPHA * (
+                latency - self.baseline_latency
+            )
+
+    def _rescale(self, factor: float, reason: str) -> None:
+        self.scale = min(max(self.scale * factor, self.min_scale), self.max_scale)
+        self.reason = reason
+
+
+def _scaled(old, new, threshold: float) -> float:
+    if old is None or new is None or old == new:
+        return 0.0
+    if not threshold:
+        return 1.0
+    return abs(new - old) / threshold
@@ -0,0 +1,373 @@
+"""Thin async client for the OpenMediaVault JSON-RPC endpoint."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+import async_timeout
+
+from .const import (
+    MISSING_SERVICE_RECHECK,
+    PAGE_CONCURRENCY,
+    RPC_TIMEOUT,
+    SESSION_IDLE_TIMEOUT,
+    SESSION_REFRESH_MARGIN,
+)
+from .omv import to_int
+from .stats import OMVStats
+
+_LOGGER = logging.getLogger(__name__)
+
+_HEADERS = {"X-Requested-With": "XMLHttpRequest"}
+_LIST_PARAMS = {"start": 0, "limit": -1, "sortfield": "", "sortdir": "asc"}
+
+# Codes d'erreur OMV pour une session absente ou expirée
+# (E_SESSION_NOT_AUTHENTICATED, E_SESSION_TIMEOUT)
+_SESSION_ERROR_CODES = {5001, 5002}
+_SESSION_ERROR_MESSAGES = ("session not authenticated", "session expired")
+# Service ou méthode inconnus de l'hôte, typiquement un greffon non installé
+# (E_RPC_SERVICE_NOT_FOUND, E_RPC_SERVICE_METHOD_NOT_EXISTS)
+_MISSING_ERROR_CODES = {3000, 3001}
+
+
+class OMVError(Exception):
+    """Raised when OMV returns an unusable or failed RPC response."""
+
+
+class OMVMissingError(OMVError):
+    """Raised when the host does not provide the requested service or method."""
+
+
+class OMVAuthError(OMVError):
+    """Raised when the OMV session is missing, expired or rejected."""
+
+    def __init__(self, message, token=None):
+        super().__init__(message)
+        # Cookie refusé, pour ne pas relancer une connexion déjà renouvelée
+        self.token = token
+
+
+class OMVAuthManager:
+    """Own the OMV session cookie and decide when to log in again.
+
+    OMV drops a web session after a period of inactivity, so the session is
+    renewed shortly before that deadline instead of waiting for a request to
+    fail.  Concurrent callers that need a fresh session share one login.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, base_url, username, password, stats):
+        self.session = session
+        self.base_url = base_url
+        self.username = username
+        self.password = password
+        self.stats = stats
+        self.token = None
+        self.cookie_name = None
+        self.last_used: float | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def authenticated(self) -> bool:
+        return bool(self.token and self.cookie_name)
+
+    @property
+    def cookie(self) -> str:
+        return f"{self.cookie_name}={self.token}"
+
+    def restore(self, cookie_name, token):
+        """Reuse a cookie saved by a previous run; its age is unknown."""
+        self.cookie_name = cookie_name
+        self.token = token
+        self.last_used = None
+
+    def touch(self):
+        """Record that the session was just used successfully."""
+        self.last_used = time.monotonic()
+
+    def needs_refresh(self) -> bool:
+        if not self.authenticated:
+            return True
+        if self.last_used is None:
+            return False
+        idle = time.monotonic() - self.last_used
+        return idle >= SESSION_IDLE_TIMEOUT - SESSION_REFRESH_MARGIN
+
+    async def ensure(self, rejected_token=None):
+        """Make sure a usable session exists.
+
+        ``rejected_token`` is the cookie a caller just saw refused; if another
+        caller already replaced it, no new login is made.
+        """
+        async with self._lock:
+            if rejected_token is not None and rejected_token != self.token:
+                return
+            if rejected_token is None and not self.needs_refresh():
+                return
+            await self._login()
+
+    async def _login(self):
+        """Authenticate to OMV."""
+        payload = {
+            "service": "Session",
+            "method": "login",
+            "params": {"username": self.username, "password": self.password},
+        }
+
+        with self.stats.measure("login"):
+            await self._post_login(payload)
+        self.stats.increment("logins")
+        self.touch()
+        _LOGGER.info("Connexion OMV réussie (%s, cookie=%s)", self.base_url, self.cookie_name)
+
+    async def _post_login(self, payload):
+        async with self.session.post(self.base_url, json=payload, headers=_HEADERS) as resp:
+            data = await resp.json()
+            response = data.get("response", {})
+
+            # Vérifie que l'auth a réussi
+            if not response or not response.get("authenticated", False):
+                raise OMVAuthError("Authentification OMV échouée")
+
+            # Cherche un cookie de session
+            cookies = resp.cookies
+            session_cookie = (
+                cookies.get("OPENMEDIAVAULT-SESSIONID")
+                or cookies.get("PHPSESSID")
+            )
+
+            if not session_cookie:
+                _LOGGER.error("Cookies reçus : %s", cookies)
+                raise OMVAuthError("Aucun cookie de session retourné")
+
+            self.token = session_cookie.value
+            self.cookie_name = session_cookie.key
+
+
+class OMVClient:
+    """Issue RPC calls against a single OMV host."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        host,
+        username,
+        password,
+        stats=None,
+        page_size: Optional[int] = None,
+    ):
+        self.session = session
+        self.host = host
+        self.stats = stats or OMVStats()
+        # Taille des pages des getList (None : tout en une réponse)
+        self.page_size = page_size
+        # Tu peux changer rpc.php → webapi/ si besoin
+        self.base_url = f"http://{self.host}/rpc.php"
+        self.auth = OMVAuthManager(session, self.base_url, username, password, self.stats)
+        self._responses: Dict[Tuple[str, str, str], Tuple[bytes, Any]] = {}
+        self._pages: Dict[str, Tuple[Tuple[Any, ...], List[Dict[str, Any]]]] = {}
+        # (service, méthode) absents de l'hôte, avec l'instant du constat
+        self._missing: Dict[Tuple[str, str], float] = {}
+
+    def is_missing(self, service: str, method: str) -> bool:
+        """Whether the host recently reported ``service.method`` as unknown.
+
+        Such calls are skipped until ``MISSING_SERVICE_RECHECK`` has passed,
+        so a plugin installed later is still picked up.
+        """
+        found_at = self._missing.get((service, method))
+        if found_at is None:
+            return False
+        if time.monotonic() - found_at < MISSING_SERVICE_RECHECK:
+            return True
+        del self._missing[(service, method)]
+        return False
+
+    async def call(self, service: str, method: str, params: Optional[Dict] = None):
+        """Run one RPC call and return its ``response`` member."""
+        if not self.auth.authenticated:
+            raise OMVAuthError("Session OMV non initialisée")
+
+        token = self.auth.token
+        headers = dict(_HEADERS)
+        headers["Cookie"] = self.auth.cookie
+        payload = {"service": service, "method": method, "params": params or {}}
+
+        with self.stats.measure(f"rpc.{service}.{method}"):
+            async with self.session.post(self.base_url, json=payload, headers=headers) as resp:
+                if resp.status in (401, 403):
+                    raise OMVAuthError(f"{service}.{method}: HTTP {resp.status}", token)
+                if resp.status >= 400:
+                    raise OMVError(f"{service}.{method}: HTTP {resp.status}")
+                body = await resp.read()
+        self.stats.increment("payload_bytes", len(body))
+
+        # Réponse identique octet pour octet : on réutilise l'objet déjà
+        # décodé, ce qui permet aussi à l'appelant de détecter l'absence de
+        # changement par identité.
+        cache_key = (service, method, json.dumps(params, sort_keys=True))
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        cached = self._responses.get(cache_key)
+        if cached is not None and cached[0] == digest:
+            self.stats.increment("unchanged_responses")
+            self.auth.touch()
+            return cached[1]
+
+        with self.stats.measure("json_decode"):
+            try:
+                data = json.loads(body)
+            except ValueError as err:
+                raise OMVError(f"{service}.{method}: JSON invalide ({err})") from err
+
+        if not isinstance(data, dict):
+            raise OMVError(f"Réponse invalide OMV : {data}")
+        error = data.get("error")
+        if error:
+            if _is_session_error(error):
+                raise OMVAuthError(f"{service}.{method}: {_error_message(error)}", token)
+            if isinstance(error, dict) and error.get("code") in _MISSING_ERROR_CODES:
+                self._missing[(service, method)] = time.monotonic()
+                raise OMVMissingError(f"{service}.{method}: {_error_message(error)}")
+            raise OMVError(f"{service}.{method}: {_error_message(error)}")
+        self.auth.touch()
+        response = data.get("response")
+        self._responses[cache_key] = (digest, response)
+        return response
+
+    async def get_list(self, service: str) -> List[Dict[str, Any]]:
+        """Run ``<service>.getList`` and return the list of rows."""
+        if self.page_size:
+            return await self._get_pages(service, self.page_size)
+        response = await self.call(service, "getList", _LIST_PARAMS)
+        return _list_rows(service, response)
+
+    async def _get_pages(self, service: str, page_size: int) -> List[Dict[str, Any]]:
+        """Fetch a list ``page_size`` rows at a time.
+
+        The first page gives the total; the remaining pages are requested
+        concurrently.  Each response stays small, so the body read and JSON
+        decode never hold the whole list at once.
+        """
+        first = await self._get_page(service, 0, page_size)
+        total = to_int(first.get("total")) if isinstance(first, dict) else None
+        pages = [first]
+        if total is not None and total > page_size:
+            limit = asyncio.Semaphore(PAGE_CONCURRENCY)
+
+            async def fetch(start):
+                async with limit:
+                    return await self._get_page(service, start, page_size)
+
+            pages.extend(
+                await asyncio.gather(
+                    *(fetch(start) for start in range(page_size, total, page_size))
+                )
+            )
+
+        # Pages toutes identiques (mêmes objets) : même liste qu'au poll précédent
+        key = tuple(pages)
+        cached = self._pages.get(service)
+        if cached is not None and len(cached[0]) == len(key) and all(
+            old is new for old, new in zip(cached[0], key)
+        ):
+            return cached[1]
+        rows = [row for page in pages for row in _list_rows(service, page)]
+        self._pages[service] = (key, rows)
+        return rows
+
+    async def _get_page(self, service: str, start: int, page_size: int):
+        params = dict(_LIST_PARAMS, start=start, limit=page_size)
+        return await self.call(service, "getList", params)
+
+    async def fetch_many(
+        self,
+        calls: Iterable[Tuple[str, Any]],
+        concurrency: Optional[int] = None,
+        return_exceptions: bool = False,
+    ) -> Dict[str, Any]:
+        """Run independent calls concurrently, retrying only auth failures.
+
+        ``calls`` yields ``(name, factory)`` pairs where ``factory`` is a
+        zero-argument coroutine function.  Each call gets its own timeout, so
+        the whole batch costs roughly the slowest call instead of the sum.
+        ``concurrency`` caps how many calls are in flight at once.  With
+        ``return_exceptions``, a failed call (other than authentication)
+        yields its exception instead of failing the whole batch.
+        """
+        calls = list(calls)
+        limit = asyncio.Semaphore(concurrency) if concurrency else None
+        # Renouvelle la session avant son expiration plutôt qu'après un échec
+        await self._timed(self.auth.ensure)
+
+        results = await self._gather(calls, limit)
+        expired = [
+            (name, factory)
+            for name, factory in calls
+            if isinstance(results[name], OMVAuthError)
+        ]
+        if expired:
+            # Si la session a expiré, on se reconnecte une seule fois
+            _LOGGER.warning("Session OMV expirée, reconnexion...")
+            self.stats.increment("relogins")
+            rejected = results[expired[0][0]].token
+            await self._timed(lambda: self.auth.ensure(rejected_token=rejected))
+            results.update(await self._gather(expired, limit))
+
+        for name, result in results.items():
+            if isinstance(result, BaseException):
+                self.stats.increment("errors")
+                if return_exceptions and not isinstance(result, OMVAuthError):
+                    continue
+                raise OMVError(f"{name}: {result!r}") from result
+        return results
+
+    async def _gather(self, calls, limit=None):
+        outcomes = await asyncio.gather(
+            *(self._limited(factory, limit) for _, factory in calls),
+            return_exceptions=True,
+        )
+        return {name: outcome for (name, _), outcome in zip(calls, outcomes)}
+
+    async def _limited(self, factory, limit):
+        if limit is None:
+            return await self._timed(factory)
+        # Le délai ne court qu'une fois la place obtenue
+        async with limit:
+            return await self._timed(factory)
+
+    async def _timed(self, factory):
+        try:
+            async with async_timeout.timeout(RPC_TIMEOUT):
+                return await factory()
+        except asyncio.TimeoutError:
+            self.stats.increment("timeouts")
+            raise
+
+
+def _list_rows(service: str, response) -> List[Dict[str, Any]]:
+    # OMV 7 retourne les lignes dans data["response"]["data"]
+    response = response or {}
+    rows = response.get("data") or response.get("response") or []
+    if not isinstance(rows, list):
+        raise OMVError(f"Réponse invalide OMV ({service}) : {response}")
+    return rows
+
+
+def _is_session_error(error) -> bool:
+    if not isinstance(error, dict):
+        return False
+    if error.get("code") in _SESSION_ERROR_CODES:
+        return True
+    message = str(error.get("message") or "").lower()
+    return any(text in message for text in _SESSION_ERROR_MESSAGES)
+
+
+def _error_message(error) -> str:
+    if isinstance(error, dict):
+        return str(error.get("message") or error)
+    return str(error)
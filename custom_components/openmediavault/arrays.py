@@ -0,0 +1,211 @@
+"""mdadm arrays and mergerfs pools built on top of the disk snapshot."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .omv import (
+    DiskRecord,
+    FilesystemIndex,
+    _filesystem_available,
+    _normalize_identifier,
+    _partition_parent,
+    bytes_to_gigabytes,
+    to_int,
+    usage_percentage,
+)
+
+KIND_RAID = "raid"
+KIND_POOL = "pool"
+
+# "Rebuild Status : 45% complete" (mdadm --detail), "recovery = 12.6%" (mdstat)
+_SYNC_RE = re.compile(
+    r"(?P<action>resync|recover|rebuild|reshape|check)\w*(?:\s+status)?\s*[:=]\s*"
+    r"(?P<progress>\d+(?:\.\d+)?)\s*%",
+    re.IGNORECASE,
+)
+# Début de mot de l'état mdadm -> action de synchronisation
+_SYNC_ACTIONS = {
+    "resync": "resync",
+    "recover": "recovery",
+    "rebuild": "recovery",
+    "reshap": "reshape",
+    "check": "check",
+}
+
+
+@dataclass(slots=True)
+class ArrayRecord:
+    """One mdadm array or mergerfs pool, aggregated from its members."""
+
+    array_id: str
+    name: str
+    kind: str
+    level: Optional[str] = None
+    state: Optional[str] = None
+    degraded: bool = False
+    sync_action: Optional[str] = None
+    sync_progress: Optional[float] = None
+    members: Tuple[str, ...] = ()
+    expected_members: Optional[int] = None
+    size_bytes: Optional[int] = None
+    available_bytes: Optional[int] = None
+    used_bytes: Optional[int] = None
+    size_gb: Optional[float] = None
+    available_gb: Optional[float] = None
+    usage_percent: Optional[float] = None
+    mountpoint: Optional[str] = None
+    filesystem_type: Optional[str] = None
+
+
+def sync_state(state: Any) -> Optional[str]:
+    """Sync action named by an mdadm state string (``"clean, resyncing"``)."""
+    state = str(state or "").lower()
+    for word, action in _SYNC_ACTIONS.items():
+        if word in state:
+            return action
+    return None
+
+
+def parse_sync(*texts: Any) -> Tuple[Optional[str], Optional[float]]:
+    """Return ``(action, percent)`` from mdadm state or detail text."""
+    for text in texts:
+        match = _SYNC_RE.search(str(text or ""))
+        if match:
+            action = sync_state(match.group("action"))
+            return action, float(match.group("progress"))
+    return None, None
+
+
+class DiskIndex:
+    """Disks of a snapshot keyed by every name an array may use for them."""
+
+    __slots__ = ("_by_device", "_by_mountpoint")
+
+    def __init__(self, disks: Iterable[DiskRecord]):
+        self._by_device: Dict[str, DiskRecord] = {}
+        self._by_mountpoint: Dict[str, DiskRecord] = {}
+        for disk in disks:
+            for key in (disk.devicefile, disk.canonicaldevicefile, disk.devicename):
+                if key:
+                    self._by_device.setdefault(key, disk)
+            if disk.mountpoint:
+                self._by_mountpoint.setdefault(disk.mountpoint.rstrip("/"), disk)
+
+    def device(self, devicefile: str) -> Optional[DiskRecord]:
+        disk = self._by_device.get(devicefile)
+        if disk is None:
+            # Membre partitionné : /dev/sdb1 → /dev/sdb
+            parent = _partition_parent(devicefile)
+            disk = self._by_device.get(parent) if parent else None
+        if disk is None and "/" in devicefile:
+            disk = self._by_device.get(devicefile.rsplit("/", 1)[1])
+        return disk
+
+    def mountpoint(self, path: str) -> Optional[DiskRecord]:
+        return self._by_mountpoint.get(path.rstrip("/"))
+
+
+def build_arrays(
+    raids: Iterable[Dict[str, Any]],
+    pools: Iterable[Dict[str, Any]],
+    disks: Iterable[DiskRecord],
+    filesystems: Optional[FilesystemIndex],
+) -> List[ArrayRecord]:
+    """Aggregate arrays and pools in one pass over each list.
+
+    Members are resolved through hash indexes over the snapshot, so the
+    cost grows with the number of members, not arrays × disks.
+    """
+    index = DiskIndex(disks)
+    arrays = [_raid_record(raid, index, filesystems) for raid in raids or ()]
+    arrays.extend(_pool_record(pool, index) for pool in pools or ())
+    return arrays
+
+
+def _raid_record(
+    raid: Dict[str, Any], index: DiskIndex, filesystems: Optional[FilesystemIndex]
+) -> ArrayRecord:
+    devicefile = raid.get("devicefile") or ""
+    devicename = devicefile.rsplit("/", 1)[-1]
+    devices = raid.get("devices") or ()
+    members = _member_names(index.device(member) for member in devices)
+    expected = to_int(raid.get("numdevices"))
+    state = raid.get("state")
+    action, progress = parse_sync(state, raid.get("detail"))
+    if action is None:
+        action = sync_state(state)
+
+    # Capacité : le système de fichiers monté sur /dev/mdX lui-même
+    filesystem = None
+    if filesystems is not None and devicefile:
+        filesystem = filesystems.match(
+            {"devicename": devicename, "canonicaldevicefile": devicefile, "devicefile": devicefile}
+        )
+    size = to_int(filesystem.get("size")) if filesystem else to_int(raid.get("size"))
+    available = _filesystem_available(filesystem) if filesystem else None
+    record = ArrayRecord(
+        array_id=_normalize_identifier(raid.get("uuid") or devicename or raid.get("name")),
+        name=raid.get("name") or devicename,
+        kind=KIND_RAID,
+        level=raid.get("level"),
+        state=state,
+        degraded="degraded" in str(state or "").lower()
+        or (expected is not None and len(devices) < expected),
+        sync_action=action,
+        sync_progress=progress,
+        members=members,
+        expected_members=expected,
+        mountpoint=filesystem.get("mountpoint") if filesystem else None,
+        filesystem_type=filesystem.get("type") if filesystem else None,
+    )
+    _set_capacity(record, size, available)
+    return record
+
+
+def _pool_record(pool: Dict[str, Any], index: DiskIndex) -> ArrayRecord:
+    paths = pool.get("paths") or pool.get("srcpaths") or ()
+    if isinstance(paths, str):
+        paths = [path for path in re.split(r"[\n:]", paths) if path.strip()]
+    disks = [index.mountpoint(path.strip()) for path in paths]
+    found = [disk for disk in disks if disk is not None]
+    members = _member_names(found)
+
+    # mergerfs additionne l'espace de ses branches
+    sizes = [disk.size_bytes for disk in found]
+    available = [disk.available_bytes for disk in found]
+    name = pool.get("name") or ""
+    record = ArrayRecord(
+        array_id=_normalize_identifier(pool.get("uuid") or name),
+        name=name,
+        kind=KIND_POOL,
+        state="degraded" if len(found) < len(disks) else "online",
+        degraded=len(found) < len(disks),
+        members=members,
+        expected_members=len(disks),
+        mountpoint=f"/srv/mergerfs/{name}" if name else None,
+        filesystem_type="fuse.mergerfs",
+    )
+    _set_capacity(
+        record,
+        sum(sizes) if found and None not in sizes else None,
+        sum(available) if found and None not in available else None,
+    )
+    return record
+
+
+def _member_names(disks: Iterable[Optional[DiskRecord]]) -> Tuple[str, ...]:
+    # dict.fromkeys : dédoublonne en gardant l'ordre, sans parcours imbriqué
+    return tuple(dict.fromkeys(disk.devicename for disk in disks if disk is not None))
+
+
+def _set_capacity(record: ArrayRecord, size: Optional[int], available: Optional[int]) -> None:
+    used = max(size - available, 0) if size is not None and available is not None else None
+    record.size_bytes = size
+    record.available_bytes = available
+    record.used_bytes = used
+    record.size_gb = bytes_to_gigabytes(size)
+    record.available_gb = bytes_to_gigabytes(available)
+    record.usage_percent = usage_percentage(size, used, available)
@@ -0,0 +1,89 @@
+"""Circuit breaker that backs off from an unreachable OMV host."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from typing import Any, Dict
+
+from yarl import URL
+
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_MAX_BACKOFF,
+    PROBE_TIMEOUT,
+)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Open after repeated failures and back off exponentially.
+
+    While open, the coordinator only runs a cheap TCP probe on each tick;
+    a successful probe moves to half-open, where one real refresh decides
+    whether the circuit closes again.
+    """
+
+    def __init__(
+        self,
+        base_interval: timedelta,
+        threshold: int = BREAKER_FAILURE_THRESHOLD,
+        max_backoff: timedelta = BREAKER_MAX_BACKOFF,
+    ):
+        self.base_interval = base_interval
+        self.threshold = threshold
+        self.max_backoff = max_backoff
+        self.state = STATE_CLOSED
+        self.failures = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == STATE_OPEN
+
+    @property
+    def backoff(self) -> timedelta:
+        """Delay before the next attempt while the circuit is not closed."""
+        if self.state == STATE_CLOSED:
+            return self.base_interval
+        exponent = max(self.failures - self.threshold, 0)
+        delay = self.base_interval * (2 ** min(exponent, 16))
+        return min(delay, max(self.max_backoff, self.base_interval))
+
+    def record_success(self) -> None:
+        self.state = STATE_CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == STATE_HALF_OPEN or self.failures >= self.threshold:
+            self.state = STATE_OPEN
+
+    def probe_succeeded(self) -> None:
+        self.state = STATE_HALF_OPEN
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_in": self.backoff.total_seconds(),
+        }
+
+
+async def async_probe(host: str, timeout: float = PROBE_TIMEOUT) -> bool:
+    """Return True when a TCP connection to the OMV web server succeeds."""
+    url = URL(f"http://{host}")
+    try:
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(url.host, url.port or 80), timeout
+        )
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True
@@ -1,7 +1,34 @@
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
-from .const import DOMAIN
+from homeassistant.core import HomeAssistant, callback
+from .const import (
+    DOMAIN,
+    CONF_ADAPTIVE_INTERVAL,
+    CONF_ADAPTIVE_MAX_INTERVAL,
+    CONF_ADAPTIVE_MIN_INTERVAL,
+    CONF_ARRAY_SCAN_INTERVAL,
+    CONF_DISK_SCAN_INTERVAL,
+    CONF_FILESYSTEM_SCAN_INTERVAL,
+    CONF_PAGE_SIZE,
+    CONF_SMART_SCAN_INTERVAL,
+    CONF_SPINDOWN_AWARE,
+    CONF_SYSTEM_SCAN_INTERVAL,
+    CONF_TEMPERATURE_THRESHOLD,
+    CONF_THROUGHPUT_SCAN_INTERVAL,
+    CONF_USAGE_THRESHOLD,
+    DEFAULT_DISK_SCAN_INTERVAL,
+    DEFAULT_ADAPTIVE_MAX_INTERVAL,
+    DEFAULT_ADAPTIVE_MIN_INTERVAL,
+    DEFAULT_ARRAY_SCAN_INTERVAL,
+    DEFAULT_FILESYSTEM_SCAN_INTERVAL,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_SMART_SCAN_INTERVAL,
+    DEFAULT_SYSTEM_SCAN_INTERVAL,
+    DEFAULT_TEMPERATURE_THRESHOLD,
+    DEFAULT_THROUGHPUT_SCAN_INTERVAL,
+    DEFAULT_USAGE_THRESHOLD,
+    MIN_SCAN_INTERVAL,
+)
 
 DATA_SCHEMA = vol.Schema({
     vol.Required("host"): str,
@@ -14,3 +41,99 @@ class OpenMediaVaultConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             return self.async_create_entry(title="OpenMediaVault", data=user_input)
         return self.async_show_form(step_id="user", data_schema=DATA_SCHEMA)
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        return OpenMediaVaultOptionsFlow(config_entry)
+
+
+class OpenMediaVaultOptionsFlow(config_entries.OptionsFlow):
+    def __init__(self, config_entry):
+        self.config_entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        minimum = int(MIN_SCAN_INTERVAL.total_seconds())
+        schema = vol.Schema({
+            vol.Required(
+                CONF_DISK_SCAN_INTERVAL,
+                default=options.get(
+                    CONF_DISK_SCAN_INTERVAL,
+                    int(DEFAULT_DISK_SCAN_INTERVAL.total_seconds()),
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=minimum)),
+            vol.Required(
+                CONF_FILESYSTEM_SCAN_INTERVAL,
+                default=options.get(
+                    CONF_FILESYSTEM_SCAN_INTERVAL,
+                    int(DEFAULT_FILESYSTEM_SCAN_INTERVAL.total_seconds()),
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=minimum)),
+            vol.Required(
+                CONF_SYSTEM_SCAN_INTERVAL,
+                default=options.get(
+                    CONF_SYSTEM_SCAN_INTERVAL,
+                    int(DEFAULT_SYSTEM_SCAN_INTERVAL.total_seconds()),
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=minimum)),
+            vol.Required(
+                CONF_ARRAY_SCAN_INTERVAL,
+                default=options.get(
+                    CONF_ARRAY_SCAN_INTERVAL,
+                    int(DEFAULT_ARRAY_SCAN_INTERVAL.total_seconds()),
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=minimum)),
+            vol.Required(
+                CONF_THROUGHPUT_SCAN_INTERVAL,
+                default=options.get(
+                    CONF_THROUGHPUT_SCAN_INTERVAL,
+                    int(DEFAULT_THROUGHPUT_SCAN_INTERVAL.total_seconds()),
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=minimum)),
+            vol.Required(
+                CONF_SMART_SCAN_INTERVAL,
+                default=options.get(
+                    CONF_SMART_SCAN_INTERVAL,
+                    int(DEFAULT_SMART_SCAN_INTERVAL.total_seconds()),
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=minimum)),
+            vol.Required(
+                CONF_ADAPTIVE_INTERVAL,
+                default=options.get(CONF_ADAPTIVE_INTERVAL, False),
+            ): bool,
+            vol.Required(
+                CONF_ADAPTIVE_MIN_INTERVAL,
+                default=options.get(
+                    CONF_ADAPTIVE_MIN_INTERVAL,
+                    int(DEFAULT_ADAPTIVE_MIN_INTERVAL.total_seconds()),
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=minimum)),
+            vol.Required(
+                CONF_ADAPTIVE_MAX_INTERVAL,
+                default=options.get(
+                    CONF_ADAPTIVE_MAX_INTERVAL,
+                    int(DEFAULT_ADAPTIVE_MAX_INTERVAL.total_seconds()),
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=minimum)),
+            vol.Required(
+                CONF_PAGE_SIZE,
+                default=options.get(CONF_PAGE_SIZE, DEFAULT_PAGE_SIZE),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Required(
+                CONF_SPINDOWN_AWARE,
+                default=options.get(CONF_SPINDOWN_AWARE, False),
+            ): bool,
+            vol.Required(
+                CONF_TEMPERATURE_THRESHOLD,
+                default=options.get(CONF_TEMPERATURE_THRESHOLD, DEFAULT_TEMPERATURE_THRESHOLD),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Required(
+                CONF_USAGE_THRESHOLD,
+                default=options.get(CONF_USAGE_THRESHOLD, DEFAULT_USAGE_THRESHOLD),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        })
+        return self.async_show_form(step_id="init", data_schema=schema)
@@ -3,3 +3,86 @@ from datetime import timedelta
 DOMAIN = "openmediavault"
 PLATFORMS = ["sensor"]
 DEFAULT_SCAN_INTERVAL = timedelta(seconds=60)
+
+# Intervalles par niveau de rafraîchissement (options, en secondes). Les
+# niveaux tournent sur le tick du plus rapide : les valeurs par défaut en
+# sont des multiples, les autres sont arrondies au tick supérieur.
+CONF_DISK_SCAN_INTERVAL = "disk_scan_interval"
+CONF_FILESYSTEM_SCAN_INTERVAL = "filesystem_scan_interval"
+DEFAULT_DISK_SCAN_INTERVAL = timedelta(seconds=40)
+DEFAULT_FILESYSTEM_SCAN_INTERVAL = timedelta(minutes=10)
+CONF_SYSTEM_SCAN_INTERVAL = "system_scan_interval"
+DEFAULT_SYSTEM_SCAN_INTERVAL = timedelta(seconds=80)
+CONF_ARRAY_SCAN_INTERVAL = "array_scan_interval"
+DEFAULT_ARRAY_SCAN_INTERVAL = timedelta(seconds=80)
+CONF_THROUGHPUT_SCAN_INTERVAL = "throughput_scan_interval"
+DEFAULT_THROUGHPUT_SCAN_INTERVAL = timedelta(seconds=80)
+MIN_SCAN_INTERVAL = timedelta(seconds=10)
+# Avance tolérée sur une échéance : HA arrondit ses rafraîchissements à la seconde
+DUE_SLACK = 1.0
+
+# Lecture SMART : niveau lent, en tâche de fond, quelques disques à la fois
+CONF_SMART_SCAN_INTERVAL = "smart_scan_interval"
+DEFAULT_SMART_SCAN_INTERVAL = timedelta(hours=1)
+SMART_CONCURRENCY = 2
+
+# Intervalle adaptatif (option) : bornes du tick et réglages
+CONF_ADAPTIVE_INTERVAL = "adaptive_interval"
+CONF_ADAPTIVE_MIN_INTERVAL = "adaptive_min_interval"
+CONF_ADAPTIVE_MAX_INTERVAL = "adaptive_max_interval"
+DEFAULT_ADAPTIVE_MIN_INTERVAL = timedelta(seconds=15)
+DEFAULT_ADAPTIVE_MAX_INTERVAL = timedelta(minutes=5)
+ADAPTIVE_STABLE_POLLS = 3
+ADAPTIVE_SLOW_LATENCY_RATIO = 2.0
+ADAPTIVE_MIN_SLOW_LATENCY = 1.0
+ADAPTIVE_LATENCY_ALPHA = 0.2
+
+# Listes longues : getList par pages de N lignes (0 : une seule réponse)
+CONF_PAGE_SIZE = "page_size"
+DEFAULT_PAGE_SIZE = 0
+PAGE_CONCURRENCY = 4
+
+# Prévision de remplissage : historique en mémoire (48 h à 10 min par point)
+FORECAST_SAMPLES = 288
+FORECAST_MIN_SAMPLES = 3
+
+# Disques en veille : garder leur dernière température connue (option)
+CONF_SPINDOWN_AWARE = "spindown_aware"
+
+# Seuils de variation significative en dessous desquels l'état n'est pas réécrit
+CONF_TEMPERATURE_THRESHOLD = "temperature_threshold"
+CONF_USAGE_THRESHOLD = "usage_threshold"
+DEFAULT_TEMPERATURE_THRESHOLD = 1.0
+DEFAULT_USAGE_THRESHOLD = 0.1
+# Délai maximum (en secondes) accordé à chaque appel RPC individuel
+RPC_TIMEOUT = 10
+# mdadm --detail ralentit pendant une reconstruction : délai propre, plus
+# court que RPC_TIMEOUT pour que la liste des grappes soit publiée sans lui
+RAID_DETAIL_TIMEOUT = 4
+# Service absent de l'hôte (greffon non installé) : revérifié toutes les heures
+MISSING_SERVICE_RECHECK = 3600
+# Expiration d'une session OMV inactive (valeur par défaut d'OMV) et marge
+# de renouvellement anticipé
+SESSION_IDLE_TIMEOUT = 300
+SESSION_REFRESH_MARGIN = 30
+
+# Pool HTTP partagé entre toutes les entrées de configuration
+DATA_SESSION = f"{DOMAIN}_session"
+CONNECTOR_LIMIT = 20
+CONNECTOR_LIMIT_PER_HOST = 4
+CONNECTOR_KEEPALIVE_TIMEOUT = 75
+DNS_CACHE_TTL = 300
+
+# Cache persistant du dernier instantané (démarrage à chaud)
+STORAGE_VERSION = 1
+# Au plus une écriture toutes les 10 min (cartes SD) ; HA écrit aussi à l'arrêt
+STORE_SAVE_DELAY = 600
+
+# Ordonnancement partagé entre plusieurs NAS
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+MAX_CONCURRENT_REFRESHES = 4
+
+# Disjoncteur : ouverture après N échecs, recul exponentiel plafonné
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_MAX_BACKOFF = timedelta(hours=1)
+PROBE_TIMEOUT = 3
@@ -0,0 +1,66 @@
+"""Diagnostics support for OpenMediaVault."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+# Numéros de série et UUID, y compris sous les identités qui en dérivent
+TO_REDACT = {
+    "host",
+    "hostname",
+    "username",
+    "password",
+    "serialnumber",
+    "token",
+    "hardware_id",
+    "disk_id",
+    "uuid",
+    "filesystem_uuid",
+    "array_id",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    system = coordinator.data.system if coordinator.data else None
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "startup": {
+            "restored_from_cache": coordinator.restored_from_cache,
+            "cache_saved_at": coordinator.cache_saved_at,
+            "setup_seconds": coordinator.setup_seconds,
+        },
+        "scheduling": {
+            "tick_interval": coordinator.tick_interval.total_seconds(),
+            "next_interval": coordinator.update_interval.total_seconds(),
+            "adaptive": (
+                coordinator.adaptive.as_dict()
+                if coordinator.adaptive is not None
+                else {"reason": "fixed"}
+            ),
+        },
+        "circuit_breaker": coordinator.breaker.as_dict(),
+        "stats": coordinator.stats.as_dict(),
+        "system": async_redact_data(asdict(system), TO_REDACT) if system else None,
+        "arrays": async_redact_data(
+            [asdict(array) for array in coordinator.data.arrays], TO_REDACT
+        )
+        if coordinator.data
+        else [],
+        "interfaces": [asdict(interface) for interface in coordinator.data.interfaces]
+        if coordinator.data
+        else [],
+        "disks": async_redact_data(
+            [disk.as_dict() for disk in coordinator.data or []], TO_REDACT
+        ),
+    }
@@ -0,0 +1,138 @@
+"""Fill-rate and time-to-full forecasts kept in memory, per filesystem."""
+
+from __future__ import annotations
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .const import FORECAST_MIN_SAMPLES, FORECAST_SAMPLES
+from .omv import DiskRecord
+
+SECONDS_PER_HOUR = 3600
+
+
+class UsageHistory:
+    """Fixed-size ring buffer of ``(timestamp, used bytes)`` samples.
+
+    The sums needed by a least-squares line are updated as samples come
+    in and fall out, so adding a sample and reading the slope are O(1).
+    Values are stored relative to an origin that moves to the oldest
+    sample each time the buffer wraps, which keeps the sums small.
+    """
+
+    __slots__ = (
+        "capacity", "times", "values", "head", "count",
+        "origin_t", "origin_y", "sum_t", "sum_y", "sum_tt", "sum_ty",
+    )
+
+    def __init__(self, capacity: int = FORECAST_SAMPLES):
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.values = array("d", bytes(8 * capacity))
+        self.head = 0
+        self.count = 0
+        self.origin_t: Optional[float] = None
+        self.origin_y = 0.0
+        self.sum_t = self.sum_y = self.sum_tt = self.sum_ty = 0.0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, timestamp: float, used: float) -> None:
+        if self.count and timestamp <= self.times[(self.head - 1) % self.capacity]:
+            # Horloge revenue en arrière ou échantillon dupliqué
+            return
+        if self.origin_t is None:
+            self.origin_t, self.origin_y = timestamp, used
+        if self.count == self.capacity:
+            self._update(self.times[self.head], self.values[self.head], -1)
+        else:
+            self.count += 1
+        self.times[self.head] = timestamp
+        self.values[self.head] = used
+        self._update(timestamp, used, 1)
+        self.head = (self.head + 1) % self.capacity
+        if self.head == 0:
+            self._rebase()
+
+    def slope(self) -> Optional[float]:
+        """Least-squares growth in bytes per second, or ``None``."""
+        if self.count < FORECAST_MIN_SAMPLES:
+            return None
+        denominator = self.count * self.sum_tt - self.sum_t * self.sum_t
+        if denominator <= 0:
+            return None
+        return (self.count * self.sum_ty - self.sum_t * self.sum_y) / denominator
+
+    def samples(self) -> List[Tuple[float, float]]:
+        """Samples from oldest to newest."""
+        start = (self.head - self.count) % self.capacity
+        return [
+            (self.times[index % self.capacity], self.values[index % self.capacity])
+            for index in range(start, start + self.count)
+        ]
+
+    def _update(self, timestamp: float, used: float, sign: int) -> None:
+        t = timestamp - self.origin_t
+        y = used - self.origin_y
+        self.sum_t += sign * t
+        self.sum_y += sign * y
+        self.sum_tt += sign * t * t
+        self.sum_ty += sign * t * y
+
+    def _rebase(self) -> None:
+        # Une fois par tour du tampon : coût amorti O(1) par échantillon
+        samples = self.samples()
+        self.origin_t, self.origin_y = samples[0]
+        self.sum_t = self.sum_y = self.sum_tt = self.sum_ty = 0.0
+        for timestamp, used in samples:
+            self._update(timestamp, used, 1)
+
+
+class UsageForecaster:
+    """Feed each filesystem's used bytes into its history and forecast."""
+
+    def __init__(self, capacity: int = FORECAST_SAMPLES):
+        self.capacity = capacity
+        self.histories: Dict[str, UsageHistory] = {}
+
+    def apply(self, disks: Iterable[DiskRecord], sampled_at: Optional[float] = None) -> bool:
+        """Set ``fill_rate`` and ``hours_to_full``; record a sample if given.
+
+        Return whether any forecast changed.
+        """
+        changed = False
+        for disk in disks:
+            key = disk.filesystem_uuid or disk.disk_id
+            if disk.used_bytes is None or not key:
+                continue
+            history = self.histories.get(key)
+            if history is None:
+                history = self.histories[key] = UsageHistory(self.capacity)
+            if sampled_at is not None:
+                history.add(sampled_at, disk.used_bytes)
+            fill_rate, hours_to_full = _forecast(history.slope(), disk.available_bytes)
+            if (fill_rate, hours_to_full) != (disk.fill_rate, disk.hours_to_full):
+                disk.fill_rate = fill_rate
+                disk.hours_to_full = hours_to_full
+                changed = True
+        return changed
+
+    def as_dict(self) -> Dict[str, List[Tuple[float, float]]]:
+        return {key: history.samples() for key, history in self.histories.items()}
+
+    def restore(self, histories: Dict[str, List[Tuple[float, float]]]) -> None:
+        for key, samples in (histories or {}).items():
+            history = self.histories[key] = UsageHistory(self.capacity)
+            for timestamp, used in samples[-self.capacity:]:
+                history.add(timestamp, used)
+
+
+def _forecast(slope: Optional[float], available: Optional[int]):
+    if slope is None:
+        return None, None
+    rate = slope * SECONDS_PER_HOUR
+    if rate <= 0 or available is None:
+        # Occupation stable ou en baisse : jamais plein
+        return round(rate), None
+    return round(rate), round(available / rate, 1)
@@ -3,7 +3,21 @@
 from __future__ import annotations
 
 import re
-from typing import Any, Dict, Iterable, List, Optional
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+BYTES_PER_GIGABYTE = 1024**3
+STANDBY_POWER_STATES = frozenset({"standby", "sleeping", "sleep"})
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_INVALID_CHARS_RE = re.compile(r"[^a-z0-9_-]")
+# /dev/nvme0n1p1 → /dev/nvme0n1, /dev/mmcblk0p2 → /dev/mmcblk0, /dev/sda1 → /dev/sda
+_PARTITION_RE = re.compile(
+    r"^(?:(?P<nvme>.*/(?:nvme\d+n\d+|mmcblk\d+))p\d+"
+    r"|(?P<disk>.*/(?:[shv]d|xvd)[a-z]+)\d+)$"
+)
 
 
 def to_int(value: Any) -> int | None:
@@ -19,59 +33,469 @@ def to_int(value: Any) -> int | None:
             return None
 
 
+def to_float(value: Any) -> float | None:
+    """Best-effort conversion to float (temperatures)."""
+    if value in (None, ""):
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+@dataclass(slots=True)
+class DiskRecord:
+    """One disk of a refresh, with its values already parsed.
+
+    Only the fields the entities use are kept from the raw OMV payload.
+    Mapping-style access (``record["size_bytes"]``, ``record.get(...)``)
+    mirrors the former merged dicts: a field that is ``None`` counts as
+    missing.
+    """
+
+    disk_id: str
+    devicename: str = ""
+    # Identité matérielle : ne dépend pas du niveau des systèmes de fichiers
+    hardware_id: str = ""
+    devicefile: Optional[str] = None
+    canonicaldevicefile: Optional[str] = None
+    model: Optional[str] = None
+    vendor: Optional[str] = None
+    description: Optional[str] = None
+    serialnumber: Optional[str] = None
+    status: Any = None
+    size: Any = None
+    uuid: Optional[str] = None
+    temperature: Optional[float] = None
+    size_bytes: Optional[int] = None
+    available_bytes: Optional[int] = None
+    used_bytes: Optional[int] = None
+    size_gb: Optional[float] = None
+    available_gb: Optional[float] = None
+    used_gb: Optional[float] = None
+    usage_percent: Optional[float] = None
+    filesystem_label: Optional[str] = None
+    mountpoint: Optional[str] = None
+    filesystem_type: Optional[str] = None
+    filesystem_uuid: Optional[str] = None
+    power_state: Optional[str] = None
+    temperature_cached: Optional[bool] = None
+    smart_health: Optional[str] = None
+    reallocated_sectors: Optional[int] = None
+    pending_sectors: Optional[int] = None
+    power_on_hours: Optional[int] = None
+    fill_rate: Optional[int] = None
+    hours_to_full: Optional[float] = None
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _DISK_RECORD_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in _DISK_RECORD_FIELDS and getattr(self, key) is not None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key) if key in _DISK_RECORD_FIELDS else None
+        return default if value is None else value
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in _DISK_RECORD_FIELDS}
+
+
+_DISK_RECORD_FIELDS = tuple(field.name for field in fields(DiskRecord))
+
+
+@dataclass(slots=True)
+class SystemInfo:
+    """Host-level figures from ``System.getInformation``."""
+
+    hostname: Optional[str] = None
+    version: Optional[str] = None
+    cpu_usage: Optional[float] = None
+    load_1: Optional[float] = None
+    load_5: Optional[float] = None
+    load_15: Optional[float] = None
+    memory_total: Optional[int] = None
+    memory_used: Optional[int] = None
+    memory_percent: Optional[float] = None
+    uptime: Optional[int] = None
+
+
+def parse_system_information(info: Any) -> Optional[SystemInfo]:
+    """Parse ``System.getInformation`` across OMV 5 to 7 layouts."""
+    if not isinstance(info, dict):
+        return None
+    load = info.get("loadAverage")
+    if isinstance(load, dict):
+        loads = [to_float(load.get(key)) for key in ("1min", "5min", "15min")]
+    else:
+        # OMV 5 : "0.12, 0.10, 0.05"
+        loads = [to_float(value) for value in str(load or "").split(",")]
+    loads = (loads + [None, None, None])[:3]
+
+    memory_total = to_int(info.get("memTotal"))
+    memory_used = to_int(info.get("memUsed"))
+    if memory_used is None and memory_total is not None:
+        available = to_int(info.get("memAvailable") or info.get("memFree"))
+        if available is not None:
+            memory_used = memory_total - available
+    memory_percent = None
+    if memory_total and memory_used is not None:
+        memory_percent = round(memory_used / memory_total * 100, 1)
+
+    cpu_usage = to_float(info.get("cpuUsage") or info.get("cpuUtilization"))
+    return SystemInfo(
+        hostname=info.get("hostname"),
+        version=info.get("version"),
+        cpu_usage=round(cpu_usage, 1) if cpu_usage is not None else None,
+        load_1=loads[0],
+        load_5=loads[1],
+        load_15=loads[2],
+        memory_total=memory_total,
+        memory_used=memory_used,
+        memory_percent=memory_percent,
+        # Secondes depuis OMV 6 ; les anciennes chaînes lisibles sont ignorées
+        uptime=to_int(info.get("uptime")),
+    )
+
+
+class OMVSnapshot:
+    """Merged disks of one refresh, indexed for constant-time lookups."""
+
+    __slots__ = (
+        "disks", "by_id", "by_hardware_id", "by_devicename", "system", "arrays", "by_array_id",
+        "interfaces", "by_interface", "_attributes",
+    )
+
+    def __init__(
+        self,
+        disks: Iterable[DiskRecord],
+        system: Optional[SystemInfo] = None,
+        arrays: Iterable[Any] = (),
+        interfaces: Iterable[Any] = (),
+    ):
+        self.disks: List[DiskRecord] = list(disks)
+        self.system = system
+        self.arrays: List[Any] = list(arrays)
+        self.by_array_id: Dict[str, Any] = {array.array_id: array for array in self.arrays}
+        self.interfaces: List[Any] = list(interfaces)
+        self.by_interface: Dict[str, Any] = {
+            interface.name: interface for interface in self.interfaces
+        }
+        # id(disk) -> (attributs communs, attributs des capteurs de capacité)
+        self._attributes: Dict[int, Tuple[Mapping[str, Any], Mapping[str, Any]]] = {}
+        self.by_id: Dict[str, DiskRecord] = {}
+        self.by_hardware_id: Dict[str, DiskRecord] = {}
+        self.by_devicename: Dict[str, DiskRecord] = {}
+        for disk in self.disks:
+            if disk.disk_id:
+                self.by_id.setdefault(disk.disk_id, disk)
+            if disk.hardware_id:
+                self.by_hardware_id.setdefault(disk.hardware_id, disk)
+            if disk.devicename:
+                self.by_devicename.setdefault(disk.devicename, disk)
+
+    def __iter__(self):
+        return iter(self.disks)
+
+    def __len__(self) -> int:
+        return len(self.disks)
+
+    def lookup(self, hardware_id: str) -> Optional[DiskRecord]:
+        """Return the disk whose ``hardware_id`` is given.
+
+        ``disk_id`` prefers the filesystem UUID, so it changes once the
+        filesystem tier first matches a disk; entities key on this instead.
+        """
+        return self.by_hardware_id.get(hardware_id)
+
+    def attributes(self, disk: DiskRecord) -> Mapping[str, Any]:
+        """State attributes shared by every entity of ``disk``, read-only."""
+        return self._disk_attributes(disk)[0]
+
+    def storage_attributes(self, disk: DiskRecord) -> Mapping[str, Any]:
+        """``attributes`` plus the suggested bounds of the capacity sensors."""
+        return self._disk_attributes(disk)[1]
+
+    def _disk_attributes(self, disk: DiskRecord):
+        # Calculé une fois par disque et par instantané, pas par entité
+        cached = self._attributes.get(id(disk))
+        if cached is None:
+            attributes = disk_attributes(disk)
+            storage = dict(attributes, suggested_min_value=0.0)
+            if disk.size_gb is not None:
+                storage["suggested_max_value"] = disk.size_gb
+            cached = self._attributes[id(disk)] = (
+                MappingProxyType(attributes),
+                MappingProxyType(storage),
+            )
+        return cached
+
+
+def disk_attributes(disk: DiskRecord) -> Dict[str, Any]:
+    """State attributes of the entities of one disk."""
+    attributes = {
+        "model": disk.model,
+        "size": disk.size,
+        "usage_percent": disk.usage_percent,
+        "status": disk.status,
+        "devicefile": disk.devicename,
+        "mountpoint": disk.mountpoint,
+        "filesystem": disk.filesystem_type,
+    }
+    if disk.power_state is not None:
+        attributes["power_state"] = disk.power_state
+        attributes["temperature_cached"] = disk.temperature_cached
+    for target_key, gigabytes in (
+        ("size_gb", disk.size_gb),
+        ("available_gb", disk.available_gb),
+        ("used_gb", disk.used_gb),
+    ):
+        if gigabytes is not None:
+            attributes[target_key] = gigabytes
+    return attributes
+
+
 def merge_disks_with_filesystems(
     disks: Iterable[Dict[str, Any]], filesystems: Iterable[Dict[str, Any]]
-) -> List[Dict[str, Any]]:
+) -> List[DiskRecord]:
     """Attach filesystem capacity details to disk payloads."""
-    merged: List[Dict[str, Any]] = []
-    for disk in disks:
-        filesystem = _find_matching_filesystem(disk, filesystems)
-        disk_copy = dict(disk)
+    index = FilesystemIndex(filesystems)
+    return [build_disk_record(disk, index.match(disk)) for disk in disks]
+
+
+class DiskMerger:
+    """Incremental ``merge_disks_with_filesystems`` across refreshes.
 
-        size_bytes = (
-            to_int(filesystem.get("size")) if filesystem else to_int(disk.get("size"))
-        )
-        available_bytes = _filesystem_available(filesystem) if filesystem else None
+    The filesystem index is rebuilt only when the filesystem list changes,
+    and a disk whose raw payload and matched filesystem are unchanged keeps
+    its previous ``DiskRecord``.
+    """
 
-        if filesystem:
-            disk_copy["filesystem_label"] = filesystem.get("label")
-            disk_copy["mountpoint"] = filesystem.get("mountpoint")
-            disk_copy["filesystem_type"] = filesystem.get("type")
-            disk_copy["filesystem_uuid"] = _normalize_identifier(filesystem.get("uuid"))
+    def __init__(self):
+        self.reused = 0
+        self._filesystems = None
+        self._index: Optional[FilesystemIndex] = None
+        self._records: Dict[str, Tuple[Dict[str, Any], Any, DiskRecord]] = {}
 
-        disk_copy["disk_id"] = _stable_disk_identifier(disk_copy)
+    @property
+    def index(self) -> Optional[FilesystemIndex]:
+        """Filesystem index of the last merge, reused for arrays."""
+        return self._index
 
-        disk_copy["size_bytes"] = size_bytes
-        disk_copy["available_bytes"] = available_bytes
-        if size_bytes is not None and available_bytes is not None:
-            disk_copy["used_bytes"] = max(size_bytes - available_bytes, 0)
+    def merge(
+        self, disks: Iterable[Dict[str, Any]], filesystems: List[Dict[str, Any]]
+    ) -> List[DiskRecord]:
+        if self._index is None or filesystems is not self._filesystems:
+            self._index = FilesystemIndex(filesystems)
+            self._filesystems = filesystems
 
-        merged.append(disk_copy)
+        merged: List[DiskRecord] = []
+        records: Dict[str, Tuple[Dict[str, Any], Any, DiskRecord]] = {}
+        for position, disk in enumerate(disks):
+            key = disk.get("devicename") or disk.get("devicefile") or f"#{position}"
+            filesystem = self._index.match(disk)
+            cached = self._records.get(key)
+            if cached is not None and cached[0] == disk and cached[1] == filesystem:
+                record = cached[2]
+                self.reused += 1
+            else:
+                record = build_disk_record(disk, filesystem)
+            records[key] = (disk, filesystem, record)
+            merged.append(record)
+        self._records = records
+        return merged
 
-    return merged
 
+def build_disk_record(
+    disk: Dict[str, Any], filesystem: Optional[Dict[str, Any]]
+) -> DiskRecord:
+    """Parse one raw OMV disk (and its filesystem) into a ``DiskRecord``."""
+    size_bytes = to_int(filesystem.get("size")) if filesystem else to_int(disk.get("size"))
+    available_bytes = _filesystem_available(filesystem) if filesystem else None
+    used_bytes = None
+    if size_bytes is not None and available_bytes is not None:
+        used_bytes = max(size_bytes - available_bytes, 0)
 
-def _find_matching_filesystem(
-    disk: Dict[str, Any], filesystems: Iterable[Dict[str, Any]]
-) -> Optional[Dict[str, Any]]:
-    """Match filesystem entry by devicename or canonical device file (exact)."""
-    disk_devicename = disk.get("devicename")
-    disk_canonical = disk.get("canonicaldevicefile")
-    if not disk_devicename and not disk_canonical:
+    filesystem_uuid = None
+    if filesystem:
+        filesystem_uuid = _normalize_identifier(filesystem.get("uuid"))
+    uuid = disk.get("uuid") or (disk.get("hdparm") or {}).get("uuid")
+
+    return DiskRecord(
+        disk_id=_stable_disk_identifier(filesystem_uuid, disk),
+        devicename=disk.get("devicename") or "",
+        hardware_id=_hardware_identifier(disk),
+        devicefile=disk.get("devicefile"),
+        canonicaldevicefile=disk.get("canonicaldevicefile"),
+        model=disk.get("model"),
+        vendor=disk.get("vendor"),
+        description=disk.get("description"),
+        serialnumber=disk.get("serialnumber"),
+        status=disk.get("status"),
+        size=disk.get("size"),
+        uuid=uuid,
+        temperature=to_float(disk.get("temperature")),
+        size_bytes=size_bytes,
+        available_bytes=available_bytes,
+        used_bytes=used_bytes,
+        size_gb=bytes_to_gigabytes(size_bytes),
+        available_gb=bytes_to_gigabytes(available_bytes),
+        used_gb=bytes_to_gigabytes(used_bytes),
+        usage_percent=usage_percentage(size_bytes, used_bytes, available_bytes),
+        filesystem_label=filesystem.get("label") if filesystem else None,
+        mountpoint=filesystem.get("mountpoint") if filesystem else None,
+        filesystem_type=filesystem.get("type") if filesystem else None,
+        filesystem_uuid=filesystem_uuid,
+        power_state=disk_power_state(disk),
+    )
+
+
+def bytes_to_gigabytes(value: Optional[int]) -> Optional[float]:
+    if value is None:
+        return None
+    if value < 0:
+        return 0.0
+    return round(value / BYTES_PER_GIGABYTE, 3)
+
+
+def usage_percentage(
+    size: Optional[int], used: Optional[int], available: Optional[int]
+) -> Optional[float]:
+    if size is None or size <= 0:
+        return None
+    if used is None and available is not None:
+        used = size - available
+    if used is None:
+        return None
+    used = min(max(used, 0), size)
+    return round((used / size) * 100, 2)
+
+
+class FilesystemIndex:
+    """Hash indexes over a filesystem list, built once per refresh.
+
+    ``match`` returns the same entry as scanning the list in order and
+    keeping the first filesystem whose devicename, canonical device file or
+    parent device file points at the disk.  Filesystems that only expose a
+    partition ``devicefile`` (``/dev/sda1``, ``/dev/nvme0n1p1``) are used as
+    a last resort.
+    """
+
+    __slots__ = (
+        "_by_devicename",
+        "_by_canonical",
+        "_by_parent",
+        "_by_parent_name",
+        "_by_partition_parent",
+    )
+
+    def __init__(self, filesystems: Iterable[Dict[str, Any]]):
+        self._by_devicename: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._by_canonical: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._by_parent: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._by_parent_name: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._by_partition_parent: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        for position, fs in enumerate(filesystems):
+            entry = (position, fs)
+            _index(self._by_devicename, fs.get("devicename"), entry)
+            _index(self._by_canonical, fs.get("canonicaldevicefile"), entry)
+            parent = fs.get("parentdevicefile")
+            _index(self._by_parent, parent, entry)
+            # Chaque suffixe après un « / » : devicename peut en contenir (cciss/c0d0)
+            for suffix in _slash_suffixes(parent):
+                _index(self._by_parent_name, suffix, entry)
+            _index(self._by_partition_parent, _partition_parent(fs.get("devicefile")), entry)
+
+    def match(self, disk: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the filesystem mounted from ``disk``, if any."""
+        disk_devicename = disk.get("devicename")
+        disk_canonical = disk.get("canonicaldevicefile")
+        if not disk_devicename and not disk_canonical:
+            return None
+
+        candidates = []
+        if disk_devicename:
+            candidates.append(self._by_devicename.get(disk_devicename))
+            candidates.append(self._by_parent_name.get(disk_devicename))
+        if disk_canonical:
+            candidates.append(self._by_canonical.get(disk_canonical))
+            candidates.append(self._by_parent.get(disk_canonical))
+        found = [entry for entry in candidates if entry is not None]
+        if found:
+            return min(found, key=lambda entry: entry[0])[1]
+
+        entry = self._by_partition_parent.get(disk.get("devicefile") or "")
+        return entry[1] if entry else None
+
+
+def _index(index: Dict[str, Tuple[int, Dict[str, Any]]], key: Optional[str], entry):
+    if key and key not in index:
+        index[key] = entry
+
+
+def _slash_suffixes(path: Optional[str]) -> Iterable[str]:
+    """Yield every ``x`` for which ``path.endswith("/" + x)``."""
+    if not path:
+        return
+    position = path.find("/")
+    while position != -1:
+        yield path[position + 1 :]
+        position = path.find("/", position + 1)
+
+
+def _partition_parent(devicefile: Optional[str]) -> Optional[str]:
+    if not devicefile:
+        return None
+    match = _PARTITION_RE.match(devicefile)
+    if not match:
         return None
+    return match.group("nvme") or match.group("disk")
 
-    for fs in filesystems:
-        if disk_devicename and fs.get("devicename") == disk_devicename:
-            return fs
-        if disk_canonical and fs.get("canonicaldevicefile") == disk_canonical:
-            return fs
-        if disk_canonical and fs.get("parentdevicefile") == disk_canonical:
-            return fs
-        if disk_devicename and fs.get("parentdevicefile", "").endswith(f"/{disk_devicename}"):
-            return fs
+
+def disk_power_state(disk: Dict[str, Any]) -> Optional[str]:
+    """Return the drive power mode reported by OMV (``hdparm -C`` wording)."""
+    for key in ("powermode", "power_mode", "powerstate", "power_state"):
+        value = disk.get(key)
+        if isinstance(value, str) and value.strip():
+            state = value.strip().lower()
+            # hdparm -C : "active/idle", "standby", "sleeping"
+            return "active" if state.startswith(("active", "idle")) else state
     return None
 
 
+class SpindownTracker:
+    """Keep the last active temperature of drives reported in standby.
+
+    This does not spare any request: the disk list is a single call for
+    every drive.  A drive OMV reports in standby has no fresh temperature,
+    so the last value read while it was active is shown instead, flagged
+    by ``temperature_cached``.  Capacity fields are left untouched.
+    """
+
+    def __init__(self):
+        self.states: Dict[str, Optional[str]] = {}
+        self._temperatures: Dict[str, float] = {}
+
+    def apply(self, disks: Iterable[DiskRecord]) -> None:
+        """Reuse cached temperatures for the merged disks that are asleep."""
+        for disk in disks:
+            key = disk.hardware_id or disk.devicename
+            state = disk.power_state
+            self.states[key] = state
+            if state in STANDBY_POWER_STATES:
+                disk.temperature = self._temperatures.get(key)
+                disk.temperature_cached = True
+            else:
+                disk.temperature_cached = False
+                if disk.temperature is not None:
+                    self._temperatures[key] = disk.temperature
+
+    def is_sleeping(self, key: str) -> bool:
+        return self.states.get(key) in STANDBY_POWER_STATES
+
+
 def _filesystem_available(fs: Dict[str, Any]) -> Optional[int]:
     if not fs:
         return None
@@ -83,9 +507,9 @@ def _filesystem_available(fs: Dict[str, Any]) -> Optional[int]:
     return None
 
 
-def _stable_disk_identifier(disk: Dict[str, Any]) -> str:
+def _stable_disk_identifier(filesystem_uuid: Optional[str], disk: Dict[str, Any]) -> str:
     candidates = [
-        disk.get("filesystem_uuid"),
+        filesystem_uuid,
         disk.get("uuid"),
         disk.get("serialnumber"),
         disk.get("serial"),
@@ -100,12 +524,28 @@ def _stable_disk_identifier(disk: Dict[str, Any]) -> str:
     return ""
 
 
+def _hardware_identifier(disk: Dict[str, Any]) -> str:
+    # Même source que les unique_id des entités : le numéro de série d'abord
+    for candidate in (
+        disk.get("serialnumber"),
+        disk.get("serial"),
+        disk.get("wwn"),
+        disk.get("devicefile"),
+        disk.get("devicename"),
+    ):
+        normalized = _normalize_identifier(candidate)
+        if normalized:
+            return normalized
+    return ""
+
+
+@lru_cache(maxsize=4096)
 def _normalize_identifier(value: Optional[str]) -> str:
     if not value:
         return ""
     normalized = value.strip().lower()
     if normalized.startswith("/dev/"):
         normalized = normalized.replace("/dev/", "", 1)
-    normalized = re.sub(r"\s+", "_", normalized)
-    normalized = re.sub(r"[^a-z0-9_-]", "_", normalized)
+    normalized = _WHITESPACE_RE.sub("_", normalized)
+    normalized = _INVALID_CHARS_RE.sub("_", normalized)
     return normalized
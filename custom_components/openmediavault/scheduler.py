@@ -0,0 +1,59 @@
+"""Spread the refreshes of several OMV hosts across their polling interval."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_SCHEDULER, MAX_CONCURRENT_REFRESHES
+
+# Décalages successifs selon le nombre d'or : chaque nouvel hôte tombe dans
+# le plus grand trou restant sans déplacer les hôtes déjà placés.
+_GOLDEN_RATIO = 0.6180339887498949
+
+
+class OMVScheduler:
+    """Give each config entry a phase within the interval and cap concurrency."""
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_REFRESHES):
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self._slots: dict[str, int] = {}
+
+    def register(self, entry_id: str) -> None:
+        if entry_id in self._slots:
+            return
+        used = set(self._slots.values())
+        slot = next(index for index in range(len(used) + 1) if index not in used)
+        self._slots[entry_id] = slot
+
+    def unregister(self, entry_id: str) -> None:
+        self._slots.pop(entry_id, None)
+
+    def phase(self, entry_id: str) -> float:
+        """Fraction of the interval at which this entry should refresh."""
+        return (self._slots.get(entry_id, 0) * _GOLDEN_RATIO) % 1
+
+    def align(self, entry_id: str, interval: timedelta, now: float) -> timedelta:
+        """Return the delay that moves the next refresh onto the entry's phase.
+
+        ``now`` is a monotonic timestamp (the event loop clock).  The result
+        stays within half an interval of ``interval`` so cadence is kept.
+        """
+        period = interval.total_seconds()
+        if period <= 0 or len(self._slots) < 2:
+            return interval
+        offset = self.phase(entry_id) * period
+        shift = (offset - (now + period)) % period
+        if shift > period / 2:
+            shift -= period
+        return timedelta(seconds=period + shift)
+
+
+def async_get_scheduler(hass: HomeAssistant) -> OMVScheduler:
+    """Return the scheduler shared by every OMV config entry."""
+    scheduler = hass.data.get(DATA_SCHEDULER)
+    if scheduler is None:
+        scheduler = hass.data[DATA_SCHEDULER] = OMVScheduler()
+    return scheduler
@@ -1,93 +1,168 @@
-from typing import Any, Optional
+from __future__ import annotations
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
     SensorStateClass,
 )
-from homeassistant.const import PERCENTAGE, UnitOfInformation, UnitOfTemperature
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfDataRate,
+    UnitOfInformation,
+    UnitOfTemperature,
+    UnitOfTime,
+)
+from homeassistant.core import callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from .arrays import KIND_RAID
 from .const import DOMAIN
-from .omv import _normalize_identifier
-
-_BYTES_PER_GIGABYTE = 1024**3
+from .omv import DiskRecord, _normalize_identifier
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    sensors = []
-    for disk in coordinator.data or []:
-        sensors.append(OMVDiskTemperatureSensor(coordinator, disk))
-        if disk.get("size_bytes") is not None:
-            sensors.append(
-                OMVDiskStorageSensor(coordinator, disk, measurement="total")
-            )
-        if disk.get("available_bytes") is not None:
-            sensors.append(
-                OMVDiskStorageSensor(coordinator, disk, measurement="available")
-            )
-        if disk.get("size_bytes") is not None:
-            sensors.append(OMVDiskUsageSensor(coordinator, disk))
-    async_add_entities(sensors)
+    # disque -> groupes de capteurs déjà créés
+    known = {}
+    known_arrays = set()
+    known_interfaces = set()
+
+    @callback
+    def _async_add_new_disks():
+        # Ajoute seulement les capteurs apparus depuis le dernier instantané ;
+        # un disque retiré garde ses entités, qui passent indisponibles.
+        sensors = []
+        for disk in coordinator.data or []:
+            created = known.setdefault(disk.hardware_id, set())
+            for group, build in _disk_sensor_groups(coordinator, disk):
+                if group not in created:
+                    created.add(group)
+                    sensors.extend(build())
+        snapshot = coordinator.data
+        for array in snapshot.arrays if snapshot else ():
+            if array.array_id not in known_arrays:
+                known_arrays.add(array.array_id)
+                sensors.extend(_array_sensors(coordinator, entry, array))
+        for interface in snapshot.interfaces if snapshot else ():
+            if interface.name not in known_interfaces:
+                known_interfaces.add(interface.name)
+                sensors.extend(
+                    OMVInterfaceSensor(coordinator, entry, interface.name, field)
+                    for field in _INTERFACE_SENSORS
+                )
+        if sensors:
+            async_add_entities(sensors)
+
+    # L'appareil de l'hôte d'abord : grappes et interfaces s'y rattachent
+    async_add_entities(
+        [OMVSystemSensor(coordinator, entry, field) for field in _SYSTEM_SENSORS]
+        + [OMVPollDiagnosticSensor(coordinator, entry, key) for key in _POLL_DIAGNOSTICS]
+    )
+    _async_add_new_disks()
+    entry.async_on_unload(coordinator.async_add_listener(_async_add_new_disks))
 
 
 class OMVDiskEntity(CoordinatorEntity):
+    # Attributs quasi statiques : inutile de les historiser à chaque état
+    _unrecorded_attributes = frozenset(
+        {
+            "model",
+            "size",
+            "devicefile",
+            "mountpoint",
+            "filesystem",
+            "size_gb",
+            "suggested_min_value",
+            "suggested_max_value",
+        }
+    )
+
     def __init__(self, coordinator, disk):
         super().__init__(coordinator)
-        self._disk_id = disk.get("disk_id") or disk.get("devicename") or ""
-        self._disk_uuid = (
-            disk.get("filesystem_uuid")
-            or disk.get("uuid")
-            or disk.get("hdparm", {}).get("uuid")
-            or self._disk_id
-            or ""
-        )
+        self._written_state = None
+        self._disk_key = disk.hardware_id
         self._object_id = (
-            _normalize_identifier(disk.get("serialnumber"))
+            _normalize_identifier(disk.serialnumber)
         )
-        self._device_name = disk.get("devicename") or ""
-        self._display_name = disk.get("model") or disk.get("description") or self._device_name
+        self._device_name = disk.devicename
+        self._display_name = disk.model or disk.description or self._device_name
         self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, self._object_id or self._disk_id)},
-            manufacturer=disk.get("vendor"),
-            model=disk.get("model"),
+            identifiers={(DOMAIN, self._object_id or self._disk_key)},
+            manufacturer=disk.vendor,
+            model=disk.model,
             name=f"OMV Disk {self._display_name}",
-            hw_version=disk.get("serialnumber"),
+            hw_version=disk.serialnumber,
         )
 
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._written_state = self._current_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when the value or attributes changed significantly."""
+        state = self._current_state()
+        if self._written_state is not None and not self._state_changed(
+            self._written_state, state
+        ):
+            return
+        self._written_state = state
+        self.async_write_ha_state()
+
+    def _current_state(self):
+        return (self.available, self.native_value, self.extra_state_attributes)
+
+    def _state_changed(self, old, new) -> bool:
+        old_available, old_value, old_attributes = old
+        new_available, new_value, new_attributes = new
+        if old_available != new_available:
+            return True
+        if _significant_change(old_value, new_value, self._value_threshold()):
+            return True
+        if old_attributes.keys() != new_attributes.keys():
+            return True
+        usage_threshold = self.coordinator.usage_threshold
+        storage_threshold = self._storage_threshold()
+        for key, new_attribute in new_attributes.items():
+            if key == "usage_percent":
+                threshold = usage_threshold
+            elif key in ("available_gb", "used_gb"):
+                threshold = storage_threshold
+            else:
+                threshold = 0
+            if _significant_change(old_attributes[key], new_attribute, threshold):
+                return True
+        return False
+
+    def _value_threshold(self) -> float:
+        return 0
+
+    def _storage_threshold(self) -> float:
+        """Gigabytes matching the usage threshold on this disk."""
+        disk = self.disk
+        if disk is None or not disk.size_gb:
+            return 0
+        return disk.size_gb * self.coordinator.usage_threshold / 100
+
+    @property
+    def available(self) -> bool:
+        # Disque absent du dernier instantané (retiré ou remplacé)
+        return super().available and self.disk is not None
+
     @property
-    def disk(self):
-        for disk in self.coordinator.data or []:
-            if disk.get("disk_id") == self._disk_id:
-                return disk
-            if not self._disk_id and disk.get("devicename") == self._device_name:
-                return disk
-        return {}
+    def disk(self) -> DiskRecord | None:
+        snapshot = self.coordinator.data
+        if not snapshot:
+            return None
+        return snapshot.lookup(self._disk_key)
 
     @property
     def extra_state_attributes(self):
         disk = self.disk
-        usage_percent = _usage_percentage(disk)
-        attributes = {
-            "model": disk.get("model"),
-            "size": disk.get("size"),
-            "usage_percent": usage_percent,
-            "status": disk.get("status"),
-            "devicefile": disk.get("devicename"),
-            "mountpoint": disk.get("mountpoint"),
-            "filesystem": disk.get("filesystem_type"),
-        }
-        for source_key, target_key in (
-            ("size_bytes", "size_gb"),
-            ("available_bytes", "available_gb"),
-            ("used_bytes", "used_gb"),
-        ):
-            gigabytes = _bytes_to_gigabytes(disk.get(source_key))
-            if gigabytes is not None:
-                attributes[target_key] = gigabytes
-
-        return attributes
+        if disk is None:
+            return {}
+        return self.coordinator.data.attributes(disk)
 
 
 class OMVDiskTemperatureSensor(OMVDiskEntity, SensorEntity):
@@ -100,13 +175,13 @@ class OMVDiskTemperatureSensor(OMVDiskEntity, SensorEntity):
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
 
+    def _value_threshold(self) -> float:
+        return self.coordinator.temperature_threshold
+
     @property
     def native_value(self):
-        temp = self.disk.get("temperature")
-        try:
-            return float(temp)
-        except (TypeError, ValueError):
-            return None
+        disk = self.disk
+        return disk.temperature if disk is not None else None
 
 
 class OMVDiskStorageSensor(OMVDiskEntity, SensorEntity):
@@ -123,33 +198,28 @@ class OMVDiskStorageSensor(OMVDiskEntity, SensorEntity):
         self._attr_native_unit_of_measurement = UnitOfInformation.GIGABYTES
         self._attr_suggested_display_precision = 3
 
+    def _value_threshold(self) -> float:
+        return self._storage_threshold()
+
     @property
     def native_value(self):
         disk = self.disk
-        key = "size_bytes" if self._measurement == "total" else "available_bytes"
-        value = disk.get(key)
-        if value is None:
+        if disk is None:
             return None
-        try:
-            size_bytes = int(value)
-        except (TypeError, ValueError):
-            return None
-        if size_bytes < 0:
-            return 0.0
-        return round(size_bytes / _BYTES_PER_GIGABYTE, 3)
+        return disk.size_gb if self._measurement == "total" else disk.available_gb
 
     @property
     def extra_state_attributes(self):
-        attributes = dict(super().extra_state_attributes)
-        attributes["suggested_min_value"] = 0.0
-
-        max_value = _bytes_to_gigabytes(self.disk.get("size_bytes"))
-        if max_value is None:
-            max_value = self.native_value
-        if max_value is not None:
-            attributes["suggested_max_value"] = max_value
-
-        return attributes
+        disk = self.disk
+        if disk is None:
+            return {"suggested_min_value": 0.0}
+        if disk.size_gb is None and self.native_value is not None:
+            # Taille inconnue : la valeur courante sert de maximum
+            return dict(
+                self.coordinator.data.storage_attributes(disk),
+                suggested_max_value=self.native_value,
+            )
+        return self.coordinator.data.storage_attributes(disk)
 
 
 class OMVDiskUsageSensor(OMVDiskEntity, SensorEntity):
@@ -161,51 +231,391 @@ class OMVDiskUsageSensor(OMVDiskEntity, SensorEntity):
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_native_unit_of_measurement = PERCENTAGE
 
+    def _value_threshold(self) -> float:
+        return self.coordinator.usage_threshold
+
     @property
     def native_value(self):
-        return _usage_percentage(self.disk)
-
-
-def _bytes_to_gigabytes(value: Any) -> Optional[float]:
-    try:
-        bytes_value = int(value)
-    except (TypeError, ValueError):
-        return None
-    if bytes_value < 0:
-        return 0.0
-    return round(bytes_value / _BYTES_PER_GIGABYTE, 3)
-
-
-def _usage_percentage(disk):
-    size = disk.get("size_bytes")
-    try:
-        size = int(size)
-    except (TypeError, ValueError):
-        return None
-    if size <= 0:
-        return None
-
-    used = disk.get("used_bytes")
-    available = disk.get("available_bytes")
-
-    try:
-        used = int(used) if used is not None else None
-    except (TypeError, ValueError):
-        used = None
-
-    if used is None and available is not None:
-        try:
-            available = int(available)
-            used = size - available
-        except (TypeError, ValueError):
-            return None
+        disk = self.disk
+        return disk.usage_percent if disk is not None else None
+
+
+# champ du DiskRecord -> (libellé, unité, device class, state class)
+_SMART_SENSORS = {
+    "smart_health": ("SMART Health", None, None, None),
+    "reallocated_sectors": (
+        "Reallocated Sectors",
+        None,
+        None,
+        SensorStateClass.MEASUREMENT,
+    ),
+    "pending_sectors": ("Pending Sectors", None, None, SensorStateClass.MEASUREMENT),
+    "power_on_hours": (
+        "Power-On Hours",
+        UnitOfTime.HOURS,
+        SensorDeviceClass.DURATION,
+        SensorStateClass.TOTAL_INCREASING,
+    ),
+}
+
+
+# champ du DiskRecord -> (libellé, unité, device class, state class)
+_FORECAST_SENSORS = {
+    "fill_rate": ("Fill Rate", "B/h", None, SensorStateClass.MEASUREMENT),
+    "hours_to_full": (
+        "Time to Full",
+        UnitOfTime.HOURS,
+        SensorDeviceClass.DURATION,
+        SensorStateClass.MEASUREMENT,
+    ),
+}
+
+
+def _has_smart(disk: DiskRecord) -> bool:
+    return any(getattr(disk, field) is not None for field in _SMART_SENSORS)
+
+
+class OMVDiskFieldSensor(OMVDiskEntity, SensorEntity):
+    """Sensor reading one ``DiskRecord`` field listed in ``_descriptions``."""
+
+    _descriptions: dict = {}
+
+    def __init__(self, coordinator, disk, field):
+        super().__init__(coordinator, disk)
+        label, unit, device_class, state_class = self._descriptions[field]
+        suffix = field.removeprefix("smart_")
+        self._field = field
+        self._attr_name = f"OMV {self._display_name} ({self._object_id}) {label}"
+        self._attr_unique_id = f"omv_disk_{self._object_id}_{field}"
+        self._attr_suggested_object_id = f"omv_{self._object_id}_{suffix}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_class = device_class
+        self._attr_state_class = state_class
+
+    @property
+    def native_value(self):
+        disk = self.disk
+        return getattr(disk, self._field) if disk is not None else None
+
+
+class OMVDiskSmartSensor(OMVDiskFieldSensor):
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _descriptions = _SMART_SENSORS
+
+
+class OMVDiskForecastSensor(OMVDiskFieldSensor):
+    """Fill rate and time to full, from the in-memory usage history."""
+
+    _descriptions = _FORECAST_SENSORS
+
+    def __init__(self, coordinator, disk, field):
+        super().__init__(coordinator, disk, field)
+        if field == "hours_to_full":
+            self._attr_suggested_unit_of_measurement = UnitOfTime.DAYS
+            self._attr_suggested_display_precision = 1
+
+
+def _disk_sensor_groups(coordinator, disk):
+    """``(group, build)`` for each sensor group ``disk`` can have right now.
+
+    A group is created as soon as its data exists, for instance once the
+    filesystem tier finally matches a hot-plugged disk.
+    """
+    yield "temperature", lambda: [OMVDiskTemperatureSensor(coordinator, disk)]
+    if disk.size_bytes is not None:
+        yield "size", lambda: [
+            OMVDiskStorageSensor(coordinator, disk, measurement="total"),
+            OMVDiskUsageSensor(coordinator, disk),
+        ]
+    if disk.available_bytes is not None:
+        yield "available", lambda: [
+            OMVDiskStorageSensor(coordinator, disk, measurement="available")
+        ]
+    if disk.used_bytes is not None:
+        yield "forecast", lambda: [
+            OMVDiskForecastSensor(coordinator, disk, field) for field in _FORECAST_SENSORS
+        ]
+    # Les capteurs SMART arrivent avec la première lecture SMART
+    if _has_smart(disk):
+        yield "smart", lambda: [
+            OMVDiskSmartSensor(coordinator, disk, field) for field in _SMART_SENSORS
+        ]
+
+
+def _array_sensors(coordinator, entry, array):
+    sensors = [OMVArrayStateSensor(coordinator, entry, array)]
+    if array.kind == KIND_RAID:
+        sensors.append(OMVArraySyncSensor(coordinator, entry, array))
+    if array.size_bytes is not None:
+        sensors.append(OMVArrayUsageSensor(coordinator, entry, array))
+    if array.available_bytes is not None:
+        sensors.append(OMVArrayAvailableSensor(coordinator, entry, array))
+    return sensors
+
+
+class OMVArrayEntity(CoordinatorEntity):
+    """Entity of an mdadm array or mergerfs pool, on its own device."""
+
+    _unrecorded_attributes = frozenset({"level", "members", "mountpoint", "filesystem"})
+
+    def __init__(self, coordinator, entry, array, key, label):
+        super().__init__(coordinator)
+        self._array_id = array.array_id
+        kind = "RAID" if array.kind == KIND_RAID else "Pool"
+        object_id = _normalize_identifier(f"{array.kind}_{array.name}")
+        self._attr_name = f"OMV {kind} {array.name} {label}"
+        self._attr_unique_id = f"omv_{entry.entry_id}_{array.kind}_{array.array_id}_{key}"
+        self._attr_suggested_object_id = f"omv_{object_id}_{key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{entry.entry_id}_{array.kind}_{array.array_id}")},
+            manufacturer="mdadm" if array.kind == KIND_RAID else "mergerfs",
+            model=array.level or array.filesystem_type,
+            name=f"OMV {kind} {array.name}",
+            via_device=(DOMAIN, entry.entry_id),
+        )
+
+    @property
+    def array(self):
+        snapshot = self.coordinator.data
+        return snapshot.by_array_id.get(self._array_id) if snapshot else None
+
+    @property
+    def available(self) -> bool:
+        return super().available and self.array is not None
+
+
+class OMVArrayStateSensor(OMVArrayEntity, SensorEntity):
+    def __init__(self, coordinator, entry, array):
+        super().__init__(coordinator, entry, array, "state", "State")
+
+    @property
+    def native_value(self):
+        array = self.array
+        return array.state if array is not None else None
+
+    @property
+    def extra_state_attributes(self):
+        array = self.array
+        if array is None:
+            return {}
+        return {
+            "level": array.level,
+            "degraded": array.degraded,
+            "sync_action": array.sync_action,
+            "members": list(array.members),
+            "expected_members": array.expected_members,
+            "mountpoint": array.mountpoint,
+            "filesystem": array.filesystem_type,
+        }
+
+
+class OMVArraySyncSensor(OMVArrayEntity, SensorEntity):
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator, entry, array):
+        super().__init__(coordinator, entry, array, "sync_progress", "Sync Progress")
+
+    @property
+    def native_value(self):
+        array = self.array
+        return array.sync_progress if array is not None else None
+
+
+class OMVArrayUsageSensor(OMVArrayEntity, SensorEntity):
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator, entry, array):
+        super().__init__(coordinator, entry, array, "usage", "Usage")
+
+    @property
+    def native_value(self):
+        array = self.array
+        return array.usage_percent if array is not None else None
+
+
+class OMVArrayAvailableSensor(OMVArrayEntity, SensorEntity):
+    _attr_device_class = SensorDeviceClass.DATA_SIZE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfInformation.GIGABYTES
+    _attr_suggested_display_precision = 3
+
+    def __init__(self, coordinator, entry, array):
+        super().__init__(coordinator, entry, array, "available", "Available Size")
+
+    @property
+    def native_value(self):
+        array = self.array
+        return array.available_gb if array is not None else None
+
+
+class OMVHostEntity(CoordinatorEntity):
+    """Entity attached to the OMV host itself rather than to a disk."""
+
+    def __init__(self, coordinator, entry):
+        super().__init__(coordinator)
+        self._entry_id = entry.entry_id
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            manufacturer="openmediavault",
+            name=f"OMV {coordinator.host}",
+        )
+
+    @property
+    def available(self) -> bool:
+        # Reste disponible quand l'hôte ne répond plus, pour exposer pourquoi
+        return True
+
+
+# champ du SystemInfo -> (libellé, unité, device class, state class)
+_SYSTEM_SENSORS = {
+    "cpu_usage": ("CPU Usage", PERCENTAGE, None, SensorStateClass.MEASUREMENT),
+    "load_1": ("Load (1 min)", None, None, SensorStateClass.MEASUREMENT),
+    "load_5": ("Load (5 min)", None, None, SensorStateClass.MEASUREMENT),
+    "load_15": ("Load (15 min)", None, None, SensorStateClass.MEASUREMENT),
+    "memory_used": (
+        "Memory Used",
+        UnitOfInformation.BYTES,
+        SensorDeviceClass.DATA_SIZE,
+        SensorStateClass.MEASUREMENT,
+    ),
+    "memory_percent": ("Memory Usage", PERCENTAGE, None, SensorStateClass.MEASUREMENT),
+    "uptime": ("Uptime", UnitOfTime.SECONDS, SensorDeviceClass.DURATION, None),
+}
 
-    if used is None:
-        return None
 
-    if used < 0:
-        used = 0
-    if used > size:
-        used = size
+class OMVSystemSensor(OMVHostEntity, SensorEntity):
+    """Host figure read from the ``system`` tier of the service registry."""
+
+    def __init__(self, coordinator, entry, field):
+        super().__init__(coordinator, entry)
+        label, unit, device_class, state_class = _SYSTEM_SENSORS[field]
+        self._field = field
+        self._attr_name = f"OMV {coordinator.host} {label}"
+        self._attr_unique_id = f"omv_{entry.entry_id}_{field}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_class = device_class
+        self._attr_state_class = state_class
+        if field == "memory_used":
+            self._attr_suggested_unit_of_measurement = UnitOfInformation.GIGABYTES
+            self._attr_suggested_display_precision = 2
+        elif field == "uptime":
+            self._attr_suggested_unit_of_measurement = UnitOfTime.DAYS
+            self._attr_suggested_display_precision = 1
+
+    @property
+    def system(self):
+        snapshot = self.coordinator.data
+        return snapshot.system if snapshot else None
+
+    @property
+    def available(self) -> bool:
+        return self.coordinator.last_update_success and self.system is not None
+
+    @property
+    def native_value(self):
+        system = self.system
+        return getattr(system, self._field) if system is not None else None
+
+
+# champ de l'InterfaceRecord -> libellé
+_INTERFACE_SENSORS = {"rx_rate": "Received", "tx_rate": "Sent"}
+
+
+class OMVInterfaceSensor(OMVHostEntity, SensorEntity):
+    """Network throughput of one interface, from the ``network`` tier."""
+
+    _attr_device_class = SensorDeviceClass.DATA_RATE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfDataRate.BYTES_PER_SECOND
+    _attr_suggested_unit_of_measurement = UnitOfDataRate.MEGABITS_PER_SECOND
+    _attr_suggested_display_precision = 2
+
+    def __init__(self, coordinator, entry, name, field):
+        super().__init__(coordinator, entry)
+        self._interface = name
+        self._field = field
+        self._attr_name = f"OMV {coordinator.host} {name} {_INTERFACE_SENSORS[field]}"
+        self._attr_unique_id = f"omv_{entry.entry_id}_{name}_{field}"
+
+    @property
+    def interface(self):
+        snapshot = self.coordinator.data
+        return snapshot.by_interface.get(self._interface) if snapshot else None
+
+    @property
+    def available(self) -> bool:
+        return self.coordinator.last_update_success and self.interface is not None
+
+    @property
+    def native_value(self):
+        interface = self.interface
+        return getattr(interface, self._field) if interface is not None else None
+
+
+# clé -> (libellé, unité, device class, state class)
+_POLL_DIAGNOSTICS = {
+    "poll_duration": (
+        "Poll Duration",
+        UnitOfTime.MILLISECONDS,
+        SensorDeviceClass.DURATION,
+        SensorStateClass.MEASUREMENT,
+    ),
+    "relogins": ("Re-logins", None, None, SensorStateClass.TOTAL_INCREASING),
+    "timeouts": ("RPC Timeouts", None, None, SensorStateClass.TOTAL_INCREASING),
+    "payload_bytes": (
+        "Payload Received",
+        UnitOfInformation.BYTES,
+        SensorDeviceClass.DATA_SIZE,
+        SensorStateClass.TOTAL_INCREASING,
+    ),
+}
+
+
+class OMVPollDiagnosticSensor(OMVHostEntity, SensorEntity):
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, entry, key):
+        super().__init__(coordinator, entry)
+        label, unit, device_class, state_class = _POLL_DIAGNOSTICS[key]
+        self._key = key
+        self._attr_name = f"OMV {coordinator.host} {label}"
+        self._attr_unique_id = f"omv_{entry.entry_id}_{key}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_class = device_class
+        self._attr_state_class = state_class
+
+    @property
+    def native_value(self):
+        stats = self.coordinator.stats
+        if self._key == "poll_duration":
+            seconds = stats.last("refresh")
+            return round(seconds * 1000, 2) if seconds is not None else None
+        return stats.counters.get(self._key)
+
+    @property
+    def extra_state_attributes(self):
+        if self._key != "poll_duration":
+            return None
+        attributes = {
+            f"circuit_{key}": value
+            for key, value in self.coordinator.breaker.as_dict().items()
+        }
+        attributes["interval_s"] = self.coordinator.update_interval.total_seconds()
+        adaptive = self.coordinator.adaptive
+        attributes["interval_reason"] = adaptive.reason if adaptive is not None else "fixed"
+        for phase, timing in self.coordinator.stats.as_dict()["timings"].items():
+            attributes[f"{phase}_ms"] = timing["last_ms"]
+        return attributes
+
 
-    return round((used / size) * 100, 2)
+def _significant_change(old, new, threshold) -> bool:
+    if old == new:
+        return False
+    if not threshold or isinstance(old, bool) or isinstance(new, bool):
+        return True
+    if not isinstance(old, (int, float)) or not isinstance(new, (int, float)):
+        return True
+    return abs(new - old) >= threshold
@@ -0,0 +1,207 @@
+"""Registry of the OMV RPC services polled by the coordinator."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .api import OMVAuthError, OMVClient, OMVMissingError
+from .arrays import parse_sync, sync_state
+from .const import (
+    CONF_ARRAY_SCAN_INTERVAL,
+    CONF_DISK_SCAN_INTERVAL,
+    CONF_FILESYSTEM_SCAN_INTERVAL,
+    CONF_SYSTEM_SCAN_INTERVAL,
+    CONF_THROUGHPUT_SCAN_INTERVAL,
+    DEFAULT_ARRAY_SCAN_INTERVAL,
+    DEFAULT_DISK_SCAN_INTERVAL,
+    DEFAULT_FILESYSTEM_SCAN_INTERVAL,
+    DEFAULT_SYSTEM_SCAN_INTERVAL,
+    DEFAULT_THROUGHPUT_SCAN_INTERVAL,
+    RAID_DETAIL_TIMEOUT,
+)
+from .omv import parse_system_information
+from .throughput import parse_interface_counters
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _rows(result: Any) -> Any:
+    return result or []
+
+
+@dataclass(frozen=True, slots=True)
+class RPCService:
+    """One RPC refreshed as its own tier.
+
+    ``parser`` turns the raw response into the value published in the
+    snapshot.  The raw response is what the tier keeps, so an unchanged
+    reply is still recognised by identity.  ``fallbacks`` are other
+    service names tried in turn when the host does not know the previous
+    one (services renamed between OMV releases); an ``optional`` service
+    provided by a plugin yields ``None`` when the host does not have it.
+    A service the host reported as unknown is not requested again before
+    the client re-checks it.  Any other error or timeout is left to the
+    coordinator: only a ``critical`` service fails the poll, any other
+    tier keeps its previous result.
+    """
+
+    name: str
+    service: str
+    method: str
+    interval_option: str
+    default_interval: timedelta
+    parser: Callable[[Any], Any] = _rows
+    params: Optional[Dict[str, Any]] = None
+    fallbacks: Tuple[str, ...] = ()
+    optional: bool = False
+    fetcher: Optional[Callable[[OMVClient, str], Awaitable[Any]]] = None
+    critical: bool = False
+
+    async def fetch(self, client: OMVClient) -> Any:
+        # Services que l'hôte a déclarés absents : pas de requête d'ici la
+        # prochaine vérification
+        names = [
+            name
+            for name in (self.service, *self.fallbacks)
+            if not client.is_missing(name, self.method)
+        ]
+        for position, service in enumerate(names):
+            try:
+                if self.fetcher is not None:
+                    return await self.fetcher(client, service)
+                if self.method == "getList":
+                    return await client.get_list(service)
+                return await client.call(service, self.method, self.params)
+            except OMVMissingError:
+                if position + 1 < len(names):
+                    continue
+                if self.optional:
+                    return None
+                raise
+        if self.optional:
+            return None
+        raise OMVMissingError(f"{self.service}.{self.method}: service absent de l'hôte")
+
+    def parse(self, result: Any) -> Any:
+        return self.parser(result)
+
+
+SERVICES: Dict[str, RPCService] = {}
+
+
+def register_service(service: RPCService) -> RPCService:
+    """Add a service; every registered service joins the batched poll."""
+    SERVICES[service.name] = service
+    return service
+
+
+async def _fetch_raid(client: OMVClient, service: str):
+    """List the arrays, with ``mdadm --detail`` for those being synced.
+
+    The detail is only requested while an array resyncs or rebuilds and
+    its state does not already give the progress; an array whose detail
+    fails or times out is listed without it.
+    """
+    rows = await client.get_list(service)
+    syncing = [
+        row
+        for row in rows
+        if sync_state(row.get("state")) and parse_sync(row.get("state"))[1] is None
+    ]
+    if not syncing:
+        return rows
+    details = await asyncio.gather(
+        *(
+            asyncio.wait_for(
+                client.call(service, "getDetail", {"devicefile": row.get("devicefile")}),
+                RAID_DETAIL_TIMEOUT,
+            )
+            for row in syncing
+        ),
+        return_exceptions=True,
+    )
+    detail_by_row = {}
+    for row, detail in zip(syncing, details):
+        if isinstance(detail, OMVAuthError):
+            raise detail
+        if isinstance(detail, BaseException):
+            _LOGGER.debug(
+                "Détail mdadm indisponible pour %s : %s", row.get("devicefile"), detail
+            )
+            continue
+        detail_by_row[id(row)] = detail
+    return [
+        dict(row, detail=detail_by_row[id(row)]) if id(row) in detail_by_row else row
+        for row in rows
+    ]
+
+
+register_service(
+    RPCService(
+        "disks",
+        "DiskMgmt",
+        "getList",
+        CONF_DISK_SCAN_INTERVAL,
+        DEFAULT_DISK_SCAN_INTERVAL,
+        critical=True,
+    )
+)
+register_service(
+    RPCService(
+        "filesystems",
+        "FileSystemMgmt",
+        "getList",
+        CONF_FILESYSTEM_SCAN_INTERVAL,
+        DEFAULT_FILESYSTEM_SCAN_INTERVAL,
+        critical=True,
+    )
+)
+register_service(
+    RPCService(
+        "system",
+        "System",
+        "getInformation",
+        CONF_SYSTEM_SCAN_INTERVAL,
+        DEFAULT_SYSTEM_SCAN_INTERVAL,
+        parser=parse_system_information,
+    )
+)
+register_service(
+    RPCService(
+        "raid",
+        # Greffon openmediavault-md depuis OMV 7, intégré avant
+        "MdMgmt",
+        "getList",
+        CONF_ARRAY_SCAN_INTERVAL,
+        DEFAULT_ARRAY_SCAN_INTERVAL,
+        fallbacks=("RaidMgmt",),
+        optional=True,
+        fetcher=_fetch_raid,
+    )
+)
+register_service(
+    RPCService(
+        "pools",
+        "Mergerfs",
+        "getList",
+        CONF_ARRAY_SCAN_INTERVAL,
+        DEFAULT_ARRAY_SCAN_INTERVAL,
+        optional=True,
+    )
+)
+# Débits réseau : un seul appel groupé pour toutes les interfaces
+register_service(
+    RPCService(
+        "network",
+        "Network",
+        "enumerateDevices",
+        CONF_THROUGHPUT_SCAN_INTERVAL,
+        DEFAULT_THROUGHPUT_SCAN_INTERVAL,
+        parser=parse_interface_counters,
+        optional=True,
+    )
+)
@@ -0,0 +1,45 @@
+"""Shared aiohttp session for every OMV config entry."""
+
+from __future__ import annotations
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CONNECTOR_KEEPALIVE_TIMEOUT,
+    CONNECTOR_LIMIT,
+    CONNECTOR_LIMIT_PER_HOST,
+    DATA_SESSION,
+    DNS_CACHE_TTL,
+)
+
+
+def async_acquire_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Return the pooled session, creating it for the first config entry."""
+    shared = hass.data.get(DATA_SESSION)
+    if shared is None or shared["session"].closed:
+        connector = aiohttp.TCPConnector(
+            limit=CONNECTOR_LIMIT,
+            limit_per_host=CONNECTOR_LIMIT_PER_HOST,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            keepalive_timeout=CONNECTOR_KEEPALIVE_TIMEOUT,
+        )
+        # Le cookie de session est envoyé explicitement par chaque client :
+        # pas de jar partagé entre les différents hôtes OMV.
+        session = aiohttp.ClientSession(
+            connector=connector, cookie_jar=aiohttp.DummyCookieJar()
+        )
+        shared = hass.data[DATA_SESSION] = {"session": session, "users": 0}
+    shared["users"] += 1
+    return shared["session"]
+
+
+async def async_release_session(hass: HomeAssistant) -> None:
+    """Drop one reference to the pooled session, closing it after the last."""
+    shared = hass.data.get(DATA_SESSION)
+    if shared is None:
+        return
+    shared["users"] -= 1
+    if shared["users"] <= 0:
+        hass.data.pop(DATA_SESSION, None)
+        await shared["session"].close()
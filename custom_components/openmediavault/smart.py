@@ -0,0 +1,166 @@
+"""SMART health collected on a slow tier, outside the main poll."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import asdict, dataclass
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional
+
+from .api import OMVAuthError, OMVClient, OMVError
+from .const import SMART_CONCURRENCY
+from .omv import STANDBY_POWER_STATES, DiskRecord, OMVSnapshot
+
+# Identifiants ATA des attributs suivis, avec le nom smartctl en secours
+_SMART_ATTRIBUTES = {
+    5: ("reallocated_sectors", "reallocated_sector_ct"),
+    197: ("pending_sectors", "current_pending_sector"),
+    9: ("power_on_hours", "power_on_hours"),
+}
+_ATTRIBUTES_BY_NAME = {name: field for field, name in _SMART_ATTRIBUTES.values()}
+_LEADING_INT_RE = re.compile(r"\d+")
+
+
+@dataclass(slots=True)
+class SmartRecord:
+    """SMART values of one disk, as last read while it was awake."""
+
+    health: Optional[str] = None
+    reallocated_sectors: Optional[int] = None
+    pending_sectors: Optional[int] = None
+    power_on_hours: Optional[int] = None
+
+
+def parse_smart(device: Dict[str, Any], attributes: Any) -> SmartRecord:
+    """Build a ``SmartRecord`` from a Smart.getList row and its attributes."""
+    record = SmartRecord(health=device.get("overallstatus") or None)
+    if isinstance(attributes, dict):
+        attributes = attributes.get("data") or []
+    for attribute in attributes or []:
+        field = _SMART_ATTRIBUTES.get(_attribute_id(attribute), (None,))[0]
+        if field is None:
+            name = str(attribute.get("attrname") or "").lower()
+            field = _ATTRIBUTES_BY_NAME.get(name)
+        if field is not None:
+            setattr(record, field, _raw_int(attribute.get("rawvalue")))
+    return record
+
+
+class SmartCollector:
+    """Read SMART data for every awake disk, a few disks at a time.
+
+    Results are kept between runs: a disk in standby is skipped rather
+    than woken up, and keeps the values read while it was last active; so
+    does a disk whose read fails or times out.  Records follow the disk's
+    ``hardware_id``, so a drive swapped into the same slot starts afresh.
+    """
+
+    def __init__(self, client: OMVClient, concurrency: int = SMART_CONCURRENCY):
+        self.client = client
+        self.stats = client.stats
+        self.concurrency = concurrency
+        # Relevés et disques déjà examinés, par identité matérielle
+        self.records: Dict[str, SmartRecord] = {}
+        self.checked: set[str] = set()
+
+    def has_unchecked(self, snapshot: OMVSnapshot | None) -> bool:
+        """Whether a disk appeared since the last run (hot-plug, swap)."""
+        return any(disk.hardware_id not in self.checked for disk in snapshot or ())
+
+    def mark_checked(self, snapshot: OMVSnapshot | None) -> None:
+        """Count the snapshot's disks as examined, for instance after a failed run."""
+        self.checked.update(disk.hardware_id for disk in snapshot or ())
+
+    async def async_collect(self, snapshot: OMVSnapshot | None) -> bool:
+        """Refresh the records; return whether any of them changed."""
+        client = self.client
+        devices = (
+            await client.fetch_many([("Smart", partial(client.get_list, "Smart"))])
+        )["Smart"]
+
+        calls = []
+        by_key = {}
+        for device in devices:
+            name = _devicename(device)
+            if not name or not device.get("devicefile"):
+                continue
+            disk = snapshot.by_devicename.get(name) if snapshot else None
+            if disk is not None and disk.power_state in STANDBY_POWER_STATES:
+                self.stats.increment("smart_wakeups_avoided")
+                continue
+            # Disque hors instantané : son nom, faute de mieux
+            key = disk.hardware_id if disk is not None else name
+            by_key[key] = device
+            calls.append((key, partial(self._attributes, device["devicefile"])))
+
+        with self.stats.measure("smart"):
+            results = await client.fetch_many(
+                calls, concurrency=self.concurrency, return_exceptions=True
+            )
+
+        changed = False
+        for key, device in by_key.items():
+            if isinstance(results[key], BaseException):
+                # Disque qui ne répond pas (délai dépassé) : il garde ses
+                # valeurs, les autres disques sont publiés
+                continue
+            record = parse_smart(device, results[key])
+            if self.records.get(key) != record:
+                self.records[key] = record
+                changed = True
+        self.checked.update(by_key)
+        self.mark_checked(snapshot)
+        return changed
+
+    async def _attributes(self, devicefile: str) -> Optional[List[Dict[str, Any]]]:
+        try:
+            return await self.client.call(
+                "Smart", "getAttributes", {"devicefile": devicefile}
+            )
+        except OMVAuthError:
+            raise
+        except OMVError:
+            # Disque sans SMART (USB, virtuel) : on garde l'état global seul
+            return None
+
+    def apply(self, disks: Iterable[DiskRecord]) -> None:
+        """Copy the cached SMART values onto the merged disks."""
+        for disk in disks:
+            record = self.records.get(disk.hardware_id)
+            if record is None:
+                continue
+            disk.smart_health = record.health
+            disk.reallocated_sectors = record.reallocated_sectors
+            disk.pending_sectors = record.pending_sectors
+            disk.power_on_hours = record.power_on_hours
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {name: asdict(record) for name, record in self.records.items()}
+
+    def restore(self, records: Dict[str, Dict[str, Any]]) -> None:
+        self.records = {
+            name: SmartRecord(**values) for name, values in (records or {}).items()
+        }
+
+
+def _devicename(device: Dict[str, Any]) -> str:
+    name = device.get("devicename")
+    if name:
+        return name
+    devicefile = device.get("devicefile") or ""
+    return devicefile.rsplit("/", 1)[-1]
+
+
+def _attribute_id(attribute: Dict[str, Any]) -> Optional[int]:
+    try:
+        return int(attribute.get("id"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _raw_int(value: Any) -> Optional[int]:
+    # smartctl formate parfois la valeur brute : "12345h+12m+03s", "0 (0 0)"
+    if isinstance(value, int):
+        return value
+    match = _LEADING_INT_RE.search(str(value or ""))
+    return int(match.group()) if match else None
@@ -0,0 +1,77 @@
+"""Lightweight timings and counters for the OMV polling hot path."""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Any, Dict
+
+
+class PhaseTiming:
+    """Last, average and maximum duration of one phase, in seconds."""
+
+    __slots__ = ("last", "total", "maximum", "count")
+
+    def __init__(self):
+        self.last = 0.0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.count = 0
+
+    def add(self, seconds: float) -> None:
+        self.last = seconds
+        self.total += seconds
+        self.count += 1
+        if seconds > self.maximum:
+            self.maximum = seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "last_ms": round(self.last * 1000, 2),
+            "avg_ms": round(self.total / self.count * 1000, 2) if self.count else None,
+            "max_ms": round(self.maximum * 1000, 2),
+            "count": self.count,
+        }
+
+
+class OMVStats:
+    """Per-phase timings (login, RPCs, JSON decode, merge, dispatch) and counters."""
+
+    def __init__(self):
+        self.timings: Dict[str, PhaseTiming] = {}
+        self.counters: Dict[str, int] = {
+            "logins": 0,
+            "relogins": 0,
+            "timeouts": 0,
+            "errors": 0,
+            "payload_bytes": 0,
+            "unchanged_responses": 0,
+            "smart_wakeups_avoided": 0,
+        }
+
+    @contextmanager
+    def measure(self, phase: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started)
+
+    def record(self, phase: str, seconds: float) -> None:
+        timing = self.timings.get(phase)
+        if timing is None:
+            timing = self.timings[phase] = PhaseTiming()
+        timing.add(seconds)
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def last(self, phase: str) -> float | None:
+        timing = self.timings.get(phase)
+        return timing.last if timing else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "timings": {phase: timing.as_dict() for phase, timing in self.timings.items()},
+            "counters": dict(self.counters),
+        }
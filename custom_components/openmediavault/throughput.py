@@ -0,0 +1,96 @@
+"""Network throughput derived from cumulative OMV interface counters."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .omv import to_int
+
+COUNTER_32_MAX = 2**32
+
+Counters = Tuple[Optional[int], ...]
+Rates = Tuple[Optional[float], ...]
+
+
+@dataclass(slots=True)
+class InterfaceRecord:
+    """Receive and transmit rates of one network interface, in bytes/s."""
+
+    name: str
+    rx_rate: Optional[float] = None
+    tx_rate: Optional[float] = None
+
+
+def counter_delta(previous: int, current: int) -> Optional[int]:
+    """Increase of a cumulative counter, or ``None`` after a reset.
+
+    A 32-bit counter that went past its maximum restarts from zero; it is
+    told apart from a reset (reboot, interface recreated) by the distance
+    travelled, which must stay under half the counter range.
+    """
+    if current >= previous:
+        return current - previous
+    wrapped = COUNTER_32_MAX - previous + current
+    if previous < COUNTER_32_MAX and wrapped < COUNTER_32_MAX // 2:
+        return wrapped
+    return None
+
+
+class CounterRates:
+    """Per-second rates between two reads of the same cumulative counters.
+
+    Only the previous read of each device is kept; a device missing from a
+    read is forgotten, and a reset yields ``None`` until the next read.
+    """
+
+    def __init__(self):
+        self._previous: Dict[str, Tuple[float, Counters]] = {}
+        self.rates: Dict[str, Rates] = {}
+
+    def sample(self, counters: Dict[str, Counters], timestamp: float) -> bool:
+        """Record a read taken at ``timestamp``; return whether a rate changed."""
+        rates: Dict[str, Rates] = {}
+        for key, values in counters.items():
+            previous = self._previous.get(key)
+            elapsed = timestamp - previous[0] if previous is not None else 0
+            if elapsed <= 0:
+                rates[key] = (None,) * len(values)
+                continue
+            rates[key] = tuple(
+                _rate(old, new, elapsed) for old, new in zip(previous[1], values)
+            )
+        self._previous = {key: (timestamp, values) for key, values in counters.items()}
+        changed = rates != self.rates
+        self.rates = rates
+        return changed
+
+
+def parse_interface_counters(rows: Any) -> Dict[str, Counters]:
+    """``(received bytes, sent bytes)`` per interface from ``enumerateDevices``."""
+    counters: Dict[str, Counters] = {}
+    for row in _rows(rows):
+        name = row.get("devicename")
+        if not name or name == "lo":
+            continue
+        # OMV range les compteurs sous "stats" ; certaines versions à plat
+        stats = row.get("stats") if isinstance(row.get("stats"), dict) else row
+        counters[name] = (to_int(stats.get("rx_bytes")), to_int(stats.get("tx_bytes")))
+    return counters
+
+
+def build_interfaces(rates: Dict[str, Rates]) -> list[InterfaceRecord]:
+    return [InterfaceRecord(name, *values) for name, values in rates.items()]
+
+
+def _rows(result: Any) -> Iterable[Dict[str, Any]]:
+    if isinstance(result, dict):
+        result = result.get("data")
+    return [row for row in result or () if isinstance(row, dict)]
+
+
+def _rate(old: Optional[int], new: Optional[int], elapsed: float) -> Optional[float]:
+    if old is None or new is None:
+        return None
+    delta = counter_delta(old, new)
+    return round(delta / elapsed, 1) if delta is not None else None
@@ -0,0 +1,128 @@
+"""Poll and entity-update benchmark against the fake OMV server.
+
+Run ``python tests/bench_poll.py`` from the repository root to print a
+table for 1 to 500 disks; ``test_benchmarks.py`` reuses these helpers with
+regression budgets.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from custom_components.openmediavault.api import OMVClient  # noqa: E402
+from custom_components.openmediavault.omv import (  # noqa: E402
+    OMVSnapshot,
+    merge_disks_with_filesystems,
+)
+from custom_components.openmediavault.sensor import (  # noqa: E402
+    OMVDiskStorageSensor,
+    OMVDiskTemperatureSensor,
+    OMVDiskUsageSensor,
+)
+from fake_omv import FakeOMV  # noqa: E402
+
+DISK_COUNTS = (1, 10, 50, 100, 250, 500)
+
+
+async def measure_poll(disks, latency=0.0, rounds=5, page_size=None):
+    """Return (wall seconds, CPU seconds, snapshot, peak concurrent RPCs) per refresh.
+
+    Times are averaged over the rounds.
+    """
+    async with FakeOMV(disks=disks) as fake:
+        fake.latency = {"DiskMgmt.getList": latency, "FileSystemMgmt.getList": latency}
+        async with aiohttp.ClientSession() as session:
+            client = OMVClient(session, fake.host, "admin", "secret", page_size=page_size)
+            await client.auth.ensure()
+            fake.max_in_flight = 0
+            wall = cpu = 0.0
+            snapshot = None
+            for _ in range(rounds):
+                wall_start, cpu_start = time.perf_counter(), time.process_time()
+                results = await client.fetch_many(
+                    (
+                        ("disks", lambda: client.get_list("DiskMgmt")),
+                        ("filesystems", lambda: client.get_list("FileSystemMgmt")),
+                    )
+                )
+                snapshot = OMVSnapshot(
+                    merge_disks_with_filesystems(results["disks"], results["filesystems"])
+                )
+                wall += time.perf_counter() - wall_start
+                cpu += time.process_time() - cpu_start
+    return wall / rounds, cpu / rounds, snapshot, fake.max_in_flight
+
+
+async def measure_peak_memory(disks, page_size=None, padding=2048):
+    """Peak traced bytes while fetching the disk list once.
+
+    The fake server runs in the same process, so its own serialisation is
+    counted too; both sides shrink with the page size.
+    """
+    async with FakeOMV(disks=disks, padding=padding) as fake:
+        async with aiohttp.ClientSession() as session:
+            client = OMVClient(session, fake.host, "admin", "secret", page_size=page_size)
+            await client.auth.ensure()
+            tracemalloc.start()
+            try:
+                rows = await client.get_list("DiskMgmt")
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    return peak, len(rows)
+
+
+def build_entities(snapshot):
+    coordinator = SimpleNamespace(
+        data=snapshot,
+        last_update_success=True,
+        temperature_threshold=1.0,
+        usage_threshold=0.1,
+    )
+    entities = []
+    for disk in snapshot:
+        entities.append(OMVDiskTemperatureSensor(coordinator, disk))
+        entities.append(OMVDiskStorageSensor(coordinator, disk, measurement="total"))
+        entities.append(OMVDiskStorageSensor(coordinator, disk, measurement="available"))
+        entities.append(OMVDiskUsageSensor(coordinator, disk))
+    return entities
+
+
+def measure_entity_update(snapshot, rounds=5):
+    """CPU seconds for every entity to evaluate its state once."""
+    entities = build_entities(snapshot)
+    started = time.process_time()
+    for _ in range(rounds):
+        for entity in entities:
+            entity._current_state()
+    return (time.process_time() - started) / rounds, len(entities)
+
+
+async def main():
+    print(f"{'disks':>6} {'poll ms':>9} {'cpu ms':>8} {'entities':>9} {'update ms':>10}")
+    for count in DISK_COUNTS:
+        wall, cpu, snapshot, _ = await measure_poll(count)
+        update, entities = measure_entity_update(snapshot)
+        print(
+            f"{count:>6} {wall * 1000:>9.2f} {cpu * 1000:>8.2f} "
+            f"{entities:>9} {update * 1000:>10.2f}"
+        )
+
+    print(f"\n{'disks':>6} {'page':>6} {'peak KiB':>9}")
+    for page_size in (None, 100, 25):
+        peak, rows = await measure_peak_memory(500, page_size)
+        print(f"{rows:>6} {page_size or '-':>6} {peak / 1024:>9.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
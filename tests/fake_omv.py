@@ -0,0 +1,269 @@
+"""Local stand-in for OpenMediaVault's ``rpc.php`` used by tests and benchmarks."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from collections import defaultdict, deque
+
+from aiohttp import web
+
+SESSION_COOKIE = "OPENMEDIAVAULT-SESSIONID"
+
+
+def make_disks(count, padding=0):
+    """DiskMgmt.getList rows; ``padding`` adds bytes to each row."""
+    return [
+        {
+            "devicename": f"sd{index}",
+            "devicefile": f"/dev/sd{index}",
+            "canonicaldevicefile": f"/dev/sd{index}",
+            "model": "WDC WD40EFRX",
+            "vendor": "WDC",
+            "serialnumber": f"WD-{index:08d}",
+            "description": f"WDC WD40EFRX [/dev/sd{index}]",
+            "size": "4000787030016",
+            "temperature": str(30 + index % 15),
+            "status": "GOOD",
+            "padding": "x" * padding,
+        }
+        for index in range(count)
+    ]
+
+
+def make_filesystems(count, padding=0):
+    """FileSystemMgmt.getList rows, one partition per disk."""
+    return [
+        {
+            "devicename": f"sd{index}1",
+            "devicefile": f"/dev/sd{index}1",
+            "parentdevicefile": f"/dev/sd{index}",
+            "uuid": f"uuid-{index:04d}",
+            "label": f"data{index}",
+            "type": "ext4",
+            "size": "3936551141376",
+            "available": str(1936551141376 - index * 1024**3),
+            "mountpoint": f"/srv/dev-disk-by-uuid-{index:04d}",
+            "padding": "x" * padding,
+        }
+        for index in range(count)
+    ]
+
+
+def make_smart_attributes(index):
+    """Smart.getAttributes rows as smartctl reports them."""
+    return [
+        {"id": 5, "attrname": "Reallocated_Sector_Ct", "rawvalue": str(index)},
+        {"id": 9, "attrname": "Power_On_Hours", "rawvalue": f"{1000 + index}h+12m+03s"},
+        {"id": 194, "attrname": "Temperature_Celsius", "rawvalue": "34 (Min/Max 20/45)"},
+        {"id": 197, "attrname": "Current_Pending_Sector", "rawvalue": "0"},
+    ]
+
+
+def make_raid(devices, name="md0", level="raid1", state="clean"):
+    """MdMgmt.getList row for an array over ``devices`` (``/dev/sdX``)."""
+    return {
+        "devicefile": f"/dev/{name}",
+        "name": f"omv:{name}",
+        "level": level,
+        "numdevices": len(devices),
+        "devices": list(devices),
+        "state": state,
+        "uuid": f"uuid-{name}",
+    }
+
+
+def make_interfaces(rx_bytes=0, tx_bytes=0):
+    """Network.enumerateDevices rows, loopback included."""
+    return [
+        {"devicename": "lo", "stats": {"rx_bytes": 0, "tx_bytes": 0}},
+        {
+            "devicename": "eth0",
+            "ether": "00:11:22:33:44:55",
+            "stats": {"rx_bytes": rx_bytes, "tx_bytes": tx_bytes},
+        },
+    ]
+
+
+def make_system_information():
+    """System.getInformation as OMV 7 returns it."""
+    return {
+        "hostname": "omv",
+        "version": "7.4.2-1 (Sandworm)",
+        "cpuModelName": "Intel(R) Celeron(R) J4125",
+        "cpuUsage": 12.345,
+        "loadAverage": {"1min": 0.42, "5min": 0.35, "15min": 0.3},
+        "memTotal": "8239349760",
+        "memUsed": "2059837440",
+        "uptime": 356400,
+    }
+
+
+class FakeOMV:
+    """aiohttp application answering Session.login and the getList RPCs.
+
+    * ``latency`` maps ``"Service.method"`` to a delay in seconds;
+    * ``max_in_flight`` records the most calls seen in progress at once;
+    * ``session_ttl`` expires sessions after that many seconds;
+    * ``inject(key, error)`` queues one failure for the next matching call:
+      an HTTP status (int), an OMV error code (``("omv", code)``) or a hang
+      (``("hang", seconds)``).
+    """
+
+    def __init__(self, disks=2, filesystems=None, padding=0, session_ttl=None):
+        self.disks = make_disks(disks, padding)
+        self.filesystems = make_filesystems(
+            disks if filesystems is None else filesystems, padding
+        )
+        self.system = make_system_information()
+        # Greffons md et mergerfs : absents tant qu'aucune liste n'est donnée
+        self.raids = None
+        self.pools = None
+        self.raid_details = {}
+        self.interfaces = make_interfaces()
+        self.latency = {}
+        self.session_ttl = session_ttl
+        self.calls = defaultdict(int)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.logins = 0
+        self.handlers = {
+            "DiskMgmt.getList": lambda params: _page(self.disks, params),
+            "FileSystemMgmt.getList": lambda params: _page(self.filesystems, params),
+            "Smart.getList": lambda params: _page(self._smart_devices(), params),
+            "Smart.getAttributes": self._smart_attributes,
+            "System.getInformation": lambda params: self.system,
+            "MdMgmt.getList": lambda params: _page(self.raids, params),
+            "MdMgmt.getDetail": lambda params: self.raid_details.get(params.get("devicefile"), ""),
+            "Mergerfs.getList": lambda params: _page(self.pools, params),
+            "Network.enumerateDevices": lambda params: self.interfaces,
+        }
+        self._sessions = {}
+        self._tokens = (f"token-{index}" for index in itertools.count(1))
+        self._errors = defaultdict(deque)
+        self._runner = None
+        self.url = None
+
+    @property
+    def host(self):
+        return self.url.split("//", 1)[1].rsplit("/", 1)[0]
+
+    def inject(self, key, error):
+        self._errors[key].append(error)
+
+    def expire_sessions(self):
+        self._sessions.clear()
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/rpc.php", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/rpc.php"
+        return self
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def _handle(self, request):
+        body = await request.json()
+        key = f"{body['service']}.{body['method']}"
+        self.calls[key] += 1
+
+        # Appels simultanés observés pendant la latence simulée
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency.get(key, 0))
+        finally:
+            self.in_flight -= 1
+        if self._errors[key]:
+            error = self._errors[key].popleft()
+            if isinstance(error, int):
+                return web.Response(status=error, text="injected")
+            kind, value = error
+            if kind == "hang":
+                await asyncio.sleep(value)
+            else:
+                return _error(value, "Injected error")
+
+        if key == "Session.login":
+            return self._login(body.get("params") or {})
+        if not self._valid_session(request):
+            return _error(5001, "Session not authenticated.")
+        handler = self.handlers.get(key)
+        service, method = key.split(".", 1)
+        if not self._installed(key) or not any(
+            name.startswith(f"{service}.") for name in self.handlers
+        ):
+            return _error(3000, f"RPC service '{service}' not found.")
+        if handler is None:
+            return _error(
+                3001, f"The method '{method}' does not exist for the RPC service '{service}'."
+            )
+        return web.json_response({"response": handler(body.get("params") or {}), "error": None})
+
+    def _installed(self, key):
+        if key.startswith("MdMgmt."):
+            return self.raids is not None
+        if key.startswith("Mergerfs."):
+            return self.pools is not None
+        return True
+
+    def _smart_devices(self):
+        return [
+            {
+                "devicename": disk["devicename"],
+                "devicefile": disk["devicefile"],
+                "overallstatus": "GOOD",
+            }
+            for disk in self.disks
+        ]
+
+    def _smart_attributes(self, params):
+        devicefile = params.get("devicefile") or ""
+        return make_smart_attributes(int(devicefile.removeprefix("/dev/sd")))
+
+    def _login(self, params):
+        self.logins += 1
+        token = next(self._tokens)
+        self._sessions[token] = time.monotonic()
+        response = web.json_response(
+            {"response": {"authenticated": True, "username": params.get("username")}, "error": None}
+        )
+        response.set_cookie(SESSION_COOKIE, token)
+        return response
+
+    def _valid_session(self, request):
+        token = request.cookies.get(SESSION_COOKIE)
+        started = self._sessions.get(token)
+        if started is None:
+            return False
+        if self.session_ttl is not None and time.monotonic() - started > self.session_ttl:
+            del self._sessions[token]
+            return False
+        return True
+
+
+def _page(rows, params):
+    start = params.get("start") or 0
+    limit = params.get("limit", -1)
+    selected = rows[start:] if limit in (None, -1) else rows[start:start + limit]
+    return {"total": len(rows), "data": selected}
+
+
+def _error(code, message):
+    return web.json_response(
+        {"response": None, "error": {"code": code, "message": message, "trace": ""}}
+    )
@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+from custom_components.openmediavault.adaptive import (
+    REASON_CHANGING,
+    REASON_SLOW,
+    REASON_STABLE,
+    REASON_STEADY,
+    AdaptiveInterval,
+    change_activity,
+)
+from custom_components.openmediavault.omv import DiskRecord, OMVSnapshot
+
+
+def _adaptive():
+    return AdaptiveInterval(
+        timedelta(seconds=60), timedelta(seconds=15), timedelta(seconds=300)
+    )
+
+
+def _snapshot(temperature, usage=50.0, reuse=None):
+    disk = reuse or DiskRecord(
+        disk_id="data", hardware_id="wd-data", temperature=temperature, usage_percent=usage
+    )
+    return OMVSnapshot([disk])
+
+
+def test_activity_is_measured_in_thresholds():
+    previous = _snapshot(30.0, 50.0)
+
+    assert change_activity(previous, _snapshot(32.0, 50.0), 1.0, 0.1) == 2.0
+    assert change_activity(previous, _snapshot(30.0, 50.05), 1.0, 0.1) < 1.0
+    assert change_activity(None, previous, 1.0, 0.1) == 0.0
+
+
+def test_reused_records_cost_nothing():
+    previous = _snapshot(30.0)
+
+    assert change_activity(previous, _snapshot(None, reuse=previous.disks[0]), 1.0, 0.1) == 0
+
+
+def test_changing_values_poll_faster_down_to_the_minimum():
+    adaptive = _adaptive()
+
+    for _ in range(5):
+        adaptive.observe(3.0, 0.05)
+
+    assert adaptive.interval == timedelta(seconds=15)
+    assert adaptive.reason == REASON_CHANGING
+
+
+def test_stable_values_slow_down_gradually_up_to_the_maximum():
+    adaptive = _adaptive()
+
+    adaptive.observe(0.0, 0.05)
+    assert adaptive.reason == REASON_STEADY
+    assert adaptive.interval == timedelta(seconds=60)
+    adaptive.observe(0.0, 0.05)
+    adaptive.observe(0.0, 0.05)
+    assert adaptive.reason == REASON_STABLE
+    assert adaptive.interval == timedelta(seconds=75)
+
+    for _ in range(100):
+        adaptive.observe(0.0, 0.05)
+    assert adaptive.interval == timedelta(seconds=300)
+
+
+def test_slow_responses_back_off_and_keep_the_baseline():
+    adaptive = _adaptive()
+    for _ in range(2):
+        adaptive.observe(0.0, 0.5)
+
+    adaptive.observe(5.0, 2.5)
+
+    # La lenteur l'emporte sur l'activité
+    assert adaptive.reason == REASON_SLOW
+    assert adaptive.interval == timedelta(seconds=120)
+    assert adaptive.baseline_latency == 0.5
+
+
+def test_small_latency_jitter_is_not_slow():
+    adaptive = _adaptive()
+    adaptive.observe(0.0, 0.01)
+
+    adaptive.observe(0.0, 0.2)
+
+    assert adaptive.reason != REASON_SLOW
+    assert adaptive.as_dict()["min_interval"] == 15.0
+
+
+def test_each_tier_is_stretched_within_the_bounds():
+    adaptive = _adaptive()
+    minutes = timedelta(minutes=1)
+
+    for _ in range(100):
+        adaptive.observe(0.0, 0.05)
+    # Déjà plus lent que le maximum : le niveau garde son intervalle
+    assert adaptive.stretch(10 * minutes) == 10 * minutes
+    assert adaptive.stretch(2 * minutes) == 5 * minutes
+
+    for _ in range(10):
+        adaptive.observe(3.0, 0.05)
+    assert adaptive.stretch(10 * minutes) == 150 * timedelta(seconds=1)
+    assert adaptive.stretch(timedelta(seconds=20)) == timedelta(seconds=15)
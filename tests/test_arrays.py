@@ -0,0 +1,183 @@
+import asyncio
+
+import aiohttp
+
+from custom_components.openmediavault import api, services
+from custom_components.openmediavault.api import OMVClient
+from custom_components.openmediavault.arrays import (
+    KIND_POOL,
+    KIND_RAID,
+    build_arrays,
+    parse_sync,
+    sync_state,
+)
+from custom_components.openmediavault.omv import DiskMerger
+from custom_components.openmediavault.services import SERVICES
+from fake_omv import FakeOMV, make_disks, make_filesystems, make_raid
+
+
+def _merged(disks, filesystems):
+    merger = DiskMerger()
+    return merger.merge(disks, filesystems), merger.index
+
+
+def test_parse_sync_reads_state_and_detail():
+    assert parse_sync("active, recovery = 12.6%") == ("recovery", 12.6)
+    assert parse_sync("clean", "Rebuild Status : 45% complete") == ("recovery", 45.0)
+    assert sync_state("clean, reshaping") == "reshape"
+    assert sync_state("clean") is None
+
+
+def test_raid_capacity_comes_from_its_filesystem():
+    disks = make_disks(2)
+    filesystems = make_filesystems(0) + [
+        {
+            "devicename": "md0",
+            "devicefile": "/dev/md0",
+            "uuid": "uuid-md0",
+            "type": "ext4",
+            "size": "4000000000000",
+            "available": "1000000000000",
+            "mountpoint": "/srv/dev-disk-by-uuid-md0",
+        }
+    ]
+    merged, index = _merged(disks, filesystems)
+
+    (array,) = build_arrays([make_raid(["/dev/sd0", "/dev/sd1"])], [], merged, index)
+
+    assert array.kind == KIND_RAID
+    assert array.members == ("sd0", "sd1")
+    assert array.degraded is False
+    assert array.usage_percent == 75.0
+    assert array.mountpoint == "/srv/dev-disk-by-uuid-md0"
+
+
+def test_raid_missing_member_is_degraded():
+    merged, index = _merged(make_disks(2), make_filesystems(2))
+    raid = make_raid(["/dev/sd0"])
+    raid["numdevices"] = 2
+
+    (array,) = build_arrays([raid], [], merged, index)
+
+    assert array.degraded is True
+    assert array.expected_members == 2
+
+
+def test_pool_sums_member_branches():
+    merged, index = _merged(make_disks(3), make_filesystems(3))
+    pool = {
+        "name": "media",
+        "uuid": "uuid-pool",
+        "paths": "/srv/dev-disk-by-uuid-0000\n/srv/dev-disk-by-uuid-0001/",
+    }
+
+    (array,) = build_arrays([], [pool], merged, index)
+
+    assert array.kind == KIND_POOL
+    assert array.members == ("sd0", "sd1")
+    assert array.size_bytes == merged[0].size_bytes + merged[1].size_bytes
+    assert array.available_bytes == merged[0].available_bytes + merged[1].available_bytes
+    assert array.state == "online"
+
+
+def test_pool_with_missing_branch_is_degraded():
+    merged, index = _merged(make_disks(1), make_filesystems(1))
+    pool = {"name": "media", "paths": "/srv/dev-disk-by-uuid-0000:/srv/missing"}
+
+    (array,) = build_arrays([], [pool], merged, index)
+
+    assert array.degraded is True
+    assert array.state == "degraded"
+
+
+def _fetch(fake, name):
+    async def runner():
+        async with aiohttp.ClientSession() as session:
+            client = OMVClient(session, fake.host, "admin", "secret")
+            await client.auth.ensure()
+            return await SERVICES[name].fetch(client)
+
+    return runner
+
+
+def test_missing_plugins_yield_no_arrays():
+    async def runner():
+        async with FakeOMV(disks=1) as fake:
+            return await _fetch(fake, "raid")(), await _fetch(fake, "pools")(), fake.calls
+
+    raids, pools, calls = asyncio.run(runner())
+
+    assert raids is None and pools is None
+    # MdMgmt absent : RaidMgmt est essayé avant d'abandonner
+    assert calls["RaidMgmt.getList"] == 1
+
+
+def test_detail_only_fetched_while_syncing():
+    async def runner():
+        async with FakeOMV(disks=2) as fake:
+            fake.raids = [make_raid(["/dev/sd0", "/dev/sd1"])]
+            clean = await _fetch(fake, "raid")()
+            fake.raids = [make_raid(["/dev/sd0", "/dev/sd1"], state="clean, resyncing")]
+            fake.raid_details["/dev/md0"] = "Resync Status : 37% complete"
+            syncing = await _fetch(fake, "raid")()
+            return clean, syncing, fake.calls["MdMgmt.getDetail"]
+
+    clean, syncing, details = asyncio.run(runner())
+
+    assert "detail" not in clean[0]
+    assert details == 1
+    merged, index = _merged(make_disks(2), make_filesystems(2))
+    (array,) = build_arrays(syncing, [], merged, index)
+    assert (array.sync_action, array.sync_progress) == ("resync", 37.0)
+
+
+def test_failed_detail_keeps_the_array_row():
+    async def runner():
+        async with FakeOMV(disks=2) as fake:
+            fake.raids = [make_raid(["/dev/sd0", "/dev/sd1"], state="clean, resyncing")]
+            fake.inject("MdMgmt.getDetail", 500)
+            return await _fetch(fake, "raid")(), fake.calls
+
+    rows, calls = asyncio.run(runner())
+
+    assert rows == [make_raid(["/dev/sd0", "/dev/sd1"], state="clean, resyncing")]
+    # Pas de repli sur l'ancien service pour un simple détail manquant
+    assert calls["RaidMgmt.getList"] == 0
+
+
+def test_slow_detail_keeps_the_array_row(monkeypatch):
+    monkeypatch.setattr(services, "RAID_DETAIL_TIMEOUT", 0.2)
+
+    async def runner():
+        async with FakeOMV(disks=2) as fake:
+            fake.raids = [make_raid(["/dev/sd0", "/dev/sd1"], state="clean, recovering")]
+            fake.inject("MdMgmt.getDetail", ("hang", 5))
+            return await _fetch(fake, "raid")(), fake.calls
+
+    rows, calls = asyncio.run(runner())
+
+    assert calls["MdMgmt.getDetail"] == 1
+    assert rows == [make_raid(["/dev/sd0", "/dev/sd1"], state="clean, recovering")]
+
+
+def test_missing_plugins_are_not_polled_again(monkeypatch):
+    async def runner():
+        async with FakeOMV(disks=1) as fake:
+            async with aiohttp.ClientSession() as session:
+                client = OMVClient(session, fake.host, "admin", "secret")
+                await client.auth.ensure()
+                for _ in range(3):
+                    for name in ("raid", "pools"):
+                        assert await SERVICES[name].fetch(client) is None
+                skipped = dict(fake.calls)
+                # Vérification périodique : un greffon installé entre-temps est vu
+                monkeypatch.setattr(api, "MISSING_SERVICE_RECHECK", 0)
+                fake.pools = []
+                await SERVICES["pools"].fetch(client)
+                return skipped, fake.calls
+
+    skipped, calls = asyncio.run(runner())
+
+    assert skipped["MdMgmt.getList"] == skipped["RaidMgmt.getList"] == 1
+    assert skipped["Mergerfs.getList"] == 1
+    assert calls["Mergerfs.getList"] == 2
@@ -0,0 +1,35 @@
+import asyncio
+
+from bench_poll import measure_entity_update, measure_peak_memory, measure_poll
+
+
+def test_poll_latency_close_to_single_rpc():
+    _, _, snapshot, in_flight = asyncio.run(measure_poll(10, latency=0.2, rounds=2))
+
+    assert len(snapshot) == 10
+    # Les deux RPC sont en cours en même temps : ~0,2 s et non 0,4 s
+    assert in_flight == 2
+
+
+def test_refresh_cpu_grows_linearly_with_disks():
+    _, small, _, _ = asyncio.run(measure_poll(50))
+    _, large, _, _ = asyncio.run(measure_poll(500))
+
+    # 10x plus de disques ne doit pas coûter 100x plus (fusion quadratique)
+    assert large < small * 30
+
+
+def test_entity_update_cost_for_500_disks():
+    _, _, snapshot, _ = asyncio.run(measure_poll(500, rounds=1))
+    per_update, entities = measure_entity_update(snapshot)
+
+    assert entities == 2000
+    assert per_update < 0.5
+
+
+def test_paged_fetch_lowers_peak_memory():
+    whole, rows = asyncio.run(measure_peak_memory(500))
+    paged, paged_rows = asyncio.run(measure_peak_memory(500, page_size=25))
+
+    assert rows == paged_rows == 500
+    assert paged < whole * 0.7
@@ -0,0 +1,42 @@
+import asyncio
+from datetime import timedelta
+
+from custom_components.openmediavault.breaker import CircuitBreaker, async_probe
+from fake_omv import FakeOMV
+
+BASE = timedelta(seconds=60)
+
+
+def test_opens_after_threshold_and_backs_off_exponentially():
+    breaker = CircuitBreaker(BASE, threshold=3, max_backoff=timedelta(minutes=10))
+    delays = []
+    for _ in range(7):
+        breaker.record_failure()
+        delays.append(breaker.backoff.total_seconds())
+
+    assert breaker.is_open
+    assert delays == [60, 60, 60, 120, 240, 480, 600]
+
+
+def test_half_open_failure_reopens_and_success_closes():
+    breaker = CircuitBreaker(BASE, threshold=1)
+    breaker.record_failure()
+    breaker.probe_succeeded()
+    assert not breaker.is_open
+
+    breaker.record_failure()
+    assert breaker.is_open
+
+    breaker.probe_succeeded()
+    breaker.record_success()
+    assert breaker.as_dict() == {"state": "closed", "consecutive_failures": 0, "retry_in": 60}
+
+
+def test_probe_detects_reachable_and_closed_ports():
+    async def scenario():
+        async with FakeOMV() as fake:
+            host = fake.host
+            reachable = await async_probe(host)
+        return reachable, await async_probe(host, timeout=1)
+
+    assert asyncio.run(scenario()) == (True, False)
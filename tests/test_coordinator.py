@@ -0,0 +1,372 @@
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.openmediavault import OMVCoordinator, RefreshTier, api
+from custom_components.openmediavault.breaker import STATE_CLOSED
+from custom_components.openmediavault.const import DUE_SLACK
+from custom_components.openmediavault.services import SERVICES
+from fake_omv import FakeOMV, make_interfaces, make_raid
+
+
+class _Store:
+    """Stand-in for ``Store``: saves immediately, loads what it was given."""
+
+    def __init__(self, payload=None):
+        self.payload = payload
+        self.saves = 0
+
+    async def async_load(self):
+        return self.payload
+
+    def async_delay_save(self, data_func, delay):
+        self.payload = data_func()
+        self.saves += 1
+
+    async def async_save(self, data):
+        self.payload = data
+        self.saves += 1
+
+
+def _hass(tasks):
+    def create_task(target, name):
+        task = asyncio.ensure_future(target)
+        tasks.append(task)
+        return task
+
+    # Seuls ces attributs sont touchés hors config entry
+    return SimpleNamespace(
+        loop=asyncio.get_running_loop(), data={}, async_create_background_task=create_task
+    )
+
+
+def _coordinator(fake, session, tasks, options=None, store=None, host=None):
+    config = {"host": host or fake.host, "username": "admin", "password": "secret"}
+    return OMVCoordinator(_hass(tasks), session, config, options, store=store)
+
+
+def _run(scenario, **fake_options):
+    async def runner():
+        tasks = []
+        async with FakeOMV(**fake_options) as fake:
+            async with aiohttp.ClientSession() as session:
+                try:
+                    return await scenario(fake, session, tasks)
+                finally:
+                    await asyncio.gather(*tasks, return_exceptions=True)
+
+    return asyncio.run(runner())
+
+
+async def _refresh(coordinator):
+    """One tick, published the way ``DataUpdateCoordinator`` does."""
+    coordinator.data = await coordinator._async_update_data()
+    return coordinator.data
+
+
+def _make_due(coordinator, *names):
+    for name in names:
+        tier = coordinator.tiers[name]
+        tier.fetched_at -= coordinator._tier_interval(tier).total_seconds()
+
+
+def _runs_per_hour(tick, intervals):
+    tiers = [RefreshTier(index, interval, None) for index, interval in enumerate(intervals)]
+    runs = [0] * len(tiers)
+    for index in range(int(3600 / tick.total_seconds())):
+        # Ticks HA arrondis à la seconde : un peu en avance ou en retard
+        now = index * tick.total_seconds() + (0.5 if index % 2 else -0.5)
+        for tier in tiers:
+            if tier.is_due(now, DUE_SLACK):
+                tier.fetched_at = now
+                runs[tier.name] += 1
+    return runs
+
+
+def test_default_intervals_are_kept_exactly():
+    intervals = [service.default_interval for service in SERVICES.values()]
+
+    runs = _runs_per_hour(min(intervals), intervals)
+
+    assert runs == [3600 / interval.total_seconds() for interval in intervals]
+
+
+def test_interval_between_ticks_rounds_up_to_the_next_tick():
+    seconds = timedelta(seconds=1)
+
+    # 60 s sur un tick de 45 s : tous les deux ticks, jamais à chaque tick
+    assert _runs_per_hour(45 * seconds, [60 * seconds]) == [40]
+
+
+def test_only_due_tiers_are_fetched():
+    async def scenario(fake, session, tasks):
+        coordinator = _coordinator(fake, session, tasks)
+        await _refresh(coordinator)
+        first = dict(fake.calls)
+        _make_due(coordinator, "disks")
+        await _refresh(coordinator)
+        return first, fake.calls
+
+    first, calls = _run(scenario)
+
+    assert first["DiskMgmt.getList"] == first["FileSystemMgmt.getList"] == 1
+    assert calls["DiskMgmt.getList"] == 2
+    assert calls["FileSystemMgmt.getList"] == 1
+    assert calls["System.getInformation"] == 1
+
+
+def test_unchanged_tier_keeps_the_snapshot():
+    async def scenario(fake, session, tasks):
+        coordinator = _coordinator(fake, session, tasks)
+        first = await _refresh(coordinator)
+        _make_due(coordinator, "disks")
+        unchanged = await _refresh(coordinator)
+        fake.disks[0]["temperature"] = "55"
+        _make_due(coordinator, "disks")
+        changed = await _refresh(coordinator)
+        return first, unchanged, changed
+
+    first, unchanged, changed = _run(scenario)
+
+    assert unchanged is first
+    assert changed is not first
+    assert changed.disks[0].temperature == 55.0
+    # Disque inchangé : même objet, son entité n'a rien à recalculer
+    assert changed.disks[1] is first.disks[1]
+
+
+def test_refresh_with_nothing_due_is_a_no_op():
+    async def scenario(fake, session, tasks):
+        store = _Store()
+        coordinator = _coordinator(fake, session, tasks, store=store)
+        first = await _refresh(coordinator)
+        await asyncio.gather(*tasks)
+        calls, saves = dict(fake.calls), store.saves
+        second = await _refresh(coordinator)
+        return first, second, calls, fake.calls, saves, store.saves
+
+    first, second, before, after, saves_before, saves_after = _run(scenario)
+
+    assert second is first
+    assert after == before
+    assert saves_after == saves_before
+
+
+def test_cache_is_written_at_most_once_per_delay():
+    async def scenario(fake, session, tasks):
+        store = _Store()
+        coordinator = _coordinator(fake, session, tasks, store=store)
+        await _refresh(coordinator)
+        for temperature in ("41", "42", "43"):
+            await asyncio.gather(*tasks)
+            fake.disks[0]["temperature"] = temperature
+            _make_due(coordinator, "disks")
+            await _refresh(coordinator)
+        throttled = store.saves
+        # Déchargement : l'écriture en attente part tout de suite
+        await coordinator.async_save_cache()
+        return throttled, store
+
+    throttled, store = _run(scenario)
+
+    assert throttled == 1
+    assert store.saves == 2
+    assert store.payload["tiers"]["disks"][0]["temperature"] == "43"
+
+
+def test_cached_snapshot_is_published_without_rpc():
+    async def scenario(fake, session, tasks):
+        store = _Store()
+        await _refresh(_coordinator(fake, session, tasks, store=store))
+        before = dict(fake.calls)
+        restored = _coordinator(fake, session, tasks, store=_Store(store.payload))
+        assert await restored.async_restore_cache()
+        after_restore = dict(fake.calls)
+        await _refresh(restored)
+        return before, after_restore, restored, fake
+
+    before, after_restore, restored, fake = _run(scenario)
+
+    assert after_restore == before
+    assert restored.restored_from_cache
+    assert [disk.devicename for disk in restored.data] == ["sd0", "sd1"]
+    # Le cookie repris du cache évite un nouveau login
+    assert fake.logins == 1
+
+
+def test_empty_store_does_not_restore():
+    async def scenario(fake, session, tasks):
+        coordinator = _coordinator(fake, session, tasks, store=_Store())
+        return await coordinator.async_restore_cache(), coordinator.data
+
+    assert _run(scenario) == (False, None)
+
+
+def test_unreachable_host_opens_the_breaker():
+    async def scenario(fake, session, tasks):
+        closed = FakeOMV()
+        await closed.start()
+        host = closed.host
+        await closed.stop()
+        coordinator = _coordinator(fake, session, tasks, host=host)
+        for _ in range(coordinator.breaker.threshold + 1):
+            with pytest.raises(UpdateFailed):
+                await _refresh(coordinator)
+        return coordinator
+
+    coordinator = _run(scenario)
+
+    assert coordinator.breaker.is_open
+    assert coordinator.update_interval == coordinator.breaker.backoff
+    assert coordinator.update_interval > coordinator.tick_interval
+
+
+def test_successful_probe_closes_the_breaker():
+    async def scenario(fake, session, tasks):
+        coordinator = _coordinator(fake, session, tasks)
+        for _ in range(coordinator.breaker.threshold):
+            coordinator.breaker.record_failure()
+        assert coordinator.breaker.is_open
+        snapshot = await _refresh(coordinator)
+        return coordinator, snapshot, fake.calls
+
+    coordinator, snapshot, calls = _run(scenario)
+
+    assert coordinator.breaker.state == STATE_CLOSED
+    assert coordinator.update_interval == coordinator.tick_interval
+    assert len(snapshot) == 2
+    assert calls["DiskMgmt.getList"] == 1
+
+
+def test_failed_host_metrics_keep_the_disk_poll():
+    async def scenario(fake, session, tasks):
+        coordinator = _coordinator(fake, session, tasks)
+        first = await _refresh(coordinator)
+        fake.inject("System.getInformation", 500)
+        fake.disks[0]["temperature"] = "55"
+        _make_due(coordinator, "disks", "system")
+        second = await _refresh(coordinator)
+        return coordinator, first, second
+
+    coordinator, first, second = _run(scenario)
+
+    assert second.disks[0].temperature == 55.0
+    # Métriques de l'hôte : dernière valeur conservée
+    assert second.system == first.system
+    assert coordinator.breaker.failures == 0
+
+
+def test_slow_network_counters_keep_the_last_rates(monkeypatch):
+    monkeypatch.setattr(api, "RPC_TIMEOUT", 0.2)
+
+    async def scenario(fake, session, tasks):
+        coordinator = _coordinator(fake, session, tasks)
+        await _refresh(coordinator)
+        fake.interfaces = make_interfaces(rx_bytes=80_000)
+        _make_due(coordinator, "network")
+        first = await _refresh(coordinator)
+        for error in (("hang", 5), 500):
+            fake.inject("Network.enumerateDevices", error)
+            _make_due(coordinator, "disks", "network")
+            await _refresh(coordinator)
+        return coordinator, first
+
+    coordinator, first = _run(scenario)
+
+    assert coordinator.client.stats.counters["timeouts"] == 1
+    assert coordinator.data.interfaces == first.interfaces
+    assert coordinator.data.by_interface["eth0"].rx_rate is not None
+    assert coordinator.breaker.failures == 0
+
+
+def test_slow_array_list_keeps_the_last_arrays(monkeypatch):
+    monkeypatch.setattr(api, "RPC_TIMEOUT", 0.2)
+
+    async def scenario(fake, session, tasks):
+        fake.raids = [make_raid(["/dev/sd0", "/dev/sd1"])]
+        coordinator = _coordinator(fake, session, tasks)
+        first = await _refresh(coordinator)
+        fake.inject("MdMgmt.getList", ("hang", 5))
+        fake.disks[0]["temperature"] = "55"
+        _make_due(coordinator, "disks", "raid")
+        second = await _refresh(coordinator)
+        return first, second
+
+    first, second = _run(scenario)
+
+    assert second.disks[0].temperature == 55.0
+    assert [array.name for array in second.arrays] == [array.name for array in first.arrays]
+    assert len(second.arrays) == 1
+
+
+def test_failed_disk_tier_fails_the_poll():
+    async def scenario(fake, session, tasks):
+        coordinator = _coordinator(fake, session, tasks)
+        await _refresh(coordinator)
+        fake.inject("DiskMgmt.getList", 500)
+        _make_due(coordinator, "disks")
+        with pytest.raises(UpdateFailed):
+            await _refresh(coordinator)
+        return coordinator
+
+    assert _run(scenario).breaker.failures == 1
+
+
+def test_smart_runs_once_in_the_background():
+    async def scenario(fake, session, tasks):
+        coordinator = _coordinator(fake, session, tasks)
+        await _refresh(coordinator)
+        started = len(tasks)
+        await asyncio.gather(*tasks)
+        _make_due(coordinator, "disks")
+        await _refresh(coordinator)
+        return coordinator, started, len(tasks), fake.calls
+
+    coordinator, started, total, calls = _run(scenario)
+
+    assert started == total == 1
+    assert calls["Smart.getList"] == 1
+    assert calls["Smart.getAttributes"] == 2
+    assert [disk.smart_health for disk in coordinator.data] == ["GOOD", "GOOD"]
+
+
+def test_adaptive_tick_keeps_slow_tiers_and_skips_idle_ticks():
+    async def scenario(fake, session, tasks):
+        coordinator = _coordinator(fake, session, tasks, {"adaptive_interval": True})
+        await _refresh(coordinator)
+        for _ in range(30):
+            _make_due(coordinator, "disks")
+            await _refresh(coordinator)
+        stretched = coordinator._tier_interval(coordinator.tiers["filesystems"])
+        polls = coordinator.adaptive.as_dict()
+        await _refresh(coordinator)
+        return coordinator, stretched, polls
+
+    coordinator, stretched, polls = _run(scenario)
+
+    assert coordinator.adaptive.interval == timedelta(minutes=5)
+    assert stretched == coordinator.tiers["filesystems"].interval
+    # Tick sans niveau dû : l'adaptation ne le compte pas comme stable
+    assert coordinator.adaptive.as_dict() == polls
+
+
+def test_failing_smart_waits_for_its_interval():
+    async def scenario(fake, session, tasks):
+        for _ in range(10):
+            fake.inject("Smart.getList", 500)
+        coordinator = _coordinator(fake, session, tasks)
+        await _refresh(coordinator)
+        for _ in range(3):
+            await asyncio.gather(*tasks)
+            _make_due(coordinator, "disks")
+            await _refresh(coordinator)
+        return fake.calls, len(tasks)
+
+    calls, started = _run(scenario)
+
+    assert calls["Smart.getList"] == 1
+    assert started == 1
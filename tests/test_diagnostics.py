@@ -0,0 +1,34 @@
+import asyncio
+from types import SimpleNamespace
+
+from custom_components.openmediavault.const import DOMAIN
+from custom_components.openmediavault.diagnostics import async_get_config_entry_diagnostics
+from custom_components.openmediavault.omv import DiskMerger, OMVSnapshot
+from fake_omv import make_disks, make_filesystems
+
+
+def test_disk_identities_are_redacted():
+    disks = make_disks(1) + [dict(make_disks(2)[1], serialnumber="new-drive")]
+    # Disque sans système de fichiers : son disk_id est aussi le numéro de série
+    merged = DiskMerger().merge(disks, make_filesystems(1))
+    coordinator = SimpleNamespace(
+        data=OMVSnapshot(merged),
+        restored_from_cache=False,
+        cache_saved_at=None,
+        setup_seconds=None,
+        tick_interval=SimpleNamespace(total_seconds=lambda: 40.0),
+        update_interval=SimpleNamespace(total_seconds=lambda: 40.0),
+        adaptive=None,
+        breaker=SimpleNamespace(as_dict=dict),
+        stats=SimpleNamespace(as_dict=dict),
+    )
+    hass = SimpleNamespace(data={DOMAIN: {"entry": coordinator}})
+    entry = SimpleNamespace(entry_id="entry", as_dict=lambda: {"data": {"host": "omv"}})
+
+    diagnostics = asyncio.run(async_get_config_entry_diagnostics(hass, entry))
+
+    text = repr(diagnostics).lower()
+    assert "new-drive" not in text
+    assert "wd-00000000" not in text
+    assert diagnostics["disks"][0]["filesystem_uuid"] == "**REDACTED**"
+    assert diagnostics["disks"][1]["hardware_id"] == "**REDACTED**"
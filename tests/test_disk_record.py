@@ -0,0 +1,119 @@
+import tracemalloc
+
+import pytest
+
+from custom_components.openmediavault.omv import (
+    DiskRecord,
+    OMVSnapshot,
+    merge_disks_with_filesystems,
+)
+
+
+def _omv_disks(count):
+    """Disk rows shaped like a DiskMgmt.getList response."""
+    return [
+        {
+            "devicename": f"sd{index}",
+            "devicefile": f"/dev/sd{index}",
+            "canonicaldevicefile": f"/dev/sd{index}",
+            "devicelinks": [f"/dev/disk/by-id/ata-DISK_{index}", f"/dev/disk/by-path/pci-{index}"],
+            "model": "WDC WD40EFRX",
+            "vendor": "WDC",
+            "serialnumber": f"WD-{index:08d}",
+            "wwn": f"0x50014ee{index:09x}",
+            "description": f"WDC WD40EFRX [/dev/sd{index}, 3.63 TiB]",
+            "size": "4000787030016",
+            "temperature": "34",
+            "israid": False,
+            "isroot": False,
+            "isreadonly": False,
+            "hotpluggable": False,
+            "isrotational": True,
+            "status": "GOOD",
+        }
+        for index in range(count)
+    ]
+
+
+def _omv_filesystems(count):
+    return [
+        {
+            "devicename": f"sd{index}1",
+            "devicefile": f"/dev/sd{index}1",
+            "parentdevicefile": f"/dev/sd{index}",
+            "uuid": f"uuid-{index}",
+            "label": f"data{index}",
+            "type": "ext4",
+            "size": "3936551141376",
+            "available": "1936551141376",
+            "mountpoint": f"/srv/dev-disk-by-uuid-{index}",
+        }
+        for index in range(count)
+    ]
+
+
+def test_record_fields_are_parsed_once():
+    disk = merge_disks_with_filesystems(_omv_disks(1), _omv_filesystems(1))[0]
+
+    assert isinstance(disk, DiskRecord)
+    assert disk.temperature == 34.0
+    assert disk.size_bytes == 3936551141376
+    assert disk.used_bytes == 2000000000000
+    assert disk.size_gb == 3666.199
+    assert disk.usage_percent == 50.81
+    assert disk.disk_id == "uuid-0"
+    assert disk["mountpoint"] == "/srv/dev-disk-by-uuid-0"
+    assert "filesystem_label" in disk
+    assert "power_state" not in disk
+    assert disk.get("unknown", "fallback") == "fallback"
+
+
+def test_records_use_less_memory_than_dict_copies():
+    disks = _omv_disks(200)
+    filesystems = _omv_filesystems(200)
+
+    tracemalloc.start()
+    records = merge_disks_with_filesystems(disks, filesystems)
+    records_size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    # Ancienne représentation : une copie du dict brut enrichie de ~12 clés
+    copies = []
+    for disk in disks:
+        copy = dict(disk)
+        for key in (
+            "filesystem_label", "mountpoint", "filesystem_type", "filesystem_uuid",
+            "disk_id", "size_bytes", "available_bytes", "used_bytes",
+            "size_gb", "available_gb", "used_gb", "usage_percent",
+        ):
+            copy[key] = None
+        copies.append(copy)
+    copies_size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(records) == len(copies) == 200
+    assert records_size < copies_size
+
+
+def test_snapshot_shares_one_read_only_attribute_mapping_per_disk(monkeypatch):
+    from custom_components.openmediavault import omv
+
+    built = []
+    original = omv.disk_attributes
+    monkeypatch.setattr(
+        omv, "disk_attributes", lambda disk: built.append(disk) or original(disk)
+    )
+    snapshot = OMVSnapshot(merge_disks_with_filesystems(_omv_disks(3), _omv_filesystems(3)))
+
+    for _ in range(4):
+        for disk in snapshot:
+            snapshot.attributes(disk)
+            snapshot.storage_attributes(disk)
+
+    assert len(built) == 3
+    disk = snapshot.disks[0]
+    assert snapshot.attributes(disk) is snapshot.attributes(disk)
+    assert snapshot.storage_attributes(disk)["suggested_max_value"] == disk.size_gb
+    with pytest.raises(TypeError):
+        snapshot.attributes(disk)["model"] = "other"
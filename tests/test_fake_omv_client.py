@@ -0,0 +1,158 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+from custom_components.openmediavault import api
+from custom_components.openmediavault.api import OMVClient, OMVError
+from fake_omv import FakeOMV
+
+
+def _fetch_lists(client):
+    return client.fetch_many(
+        (
+            ("disks", lambda: client.get_list("DiskMgmt")),
+            ("filesystems", lambda: client.get_list("FileSystemMgmt")),
+        )
+    )
+
+
+def _run(scenario, **fake_options):
+    async def runner():
+        async with FakeOMV(**fake_options) as fake:
+            async with aiohttp.ClientSession() as session:
+                client = OMVClient(session, fake.host, "admin", "secret")
+                return await scenario(fake, client)
+
+    return asyncio.run(runner())
+
+
+def test_rpcs_run_concurrently():
+    async def scenario(fake, client):
+        await client.auth.ensure()
+        fake.latency = {"DiskMgmt.getList": 0.2, "FileSystemMgmt.getList": 0.3}
+        results = await _fetch_lists(client)
+        return results, fake.max_in_flight
+
+    results, in_flight = _run(scenario, disks=3)
+
+    assert len(results["disks"]) == 3
+    assert len(results["filesystems"]) == 3
+    assert in_flight == 2
+
+
+def test_expired_session_relogs_once_and_retries_failed_calls():
+    async def scenario(fake, client):
+        await _fetch_lists(client)
+        fake.expire_sessions()
+        await _fetch_lists(client)
+        return fake
+
+    fake = _run(scenario)
+
+    assert fake.logins == 2
+    assert fake.calls["DiskMgmt.getList"] == 2 + 1
+    assert fake.calls["FileSystemMgmt.getList"] == 2 + 1
+
+
+def test_concurrent_callers_share_one_login():
+    async def scenario(fake, client):
+        await _fetch_lists(client)
+        fake.expire_sessions()
+        await asyncio.gather(_fetch_lists(client), _fetch_lists(client))
+        return fake
+
+    assert _run(scenario).logins == 2
+
+
+def test_transient_error_does_not_relogin_or_refetch():
+    async def scenario(fake, client):
+        await client.auth.ensure()
+        fake.inject("FileSystemMgmt.getList", 500)
+        with pytest.raises(OMVError):
+            await _fetch_lists(client)
+        return fake
+
+    fake = _run(scenario)
+
+    assert fake.logins == 1
+    assert fake.calls["DiskMgmt.getList"] == 1
+    assert fake.calls["FileSystemMgmt.getList"] == 1
+
+
+def test_omv_error_is_not_treated_as_expired_session():
+    async def scenario(fake, client):
+        fake.inject("DiskMgmt.getList", ("omv", 3000))
+        with pytest.raises(OMVError, match="Injected error"):
+            await _fetch_lists(client)
+        return fake
+
+    assert _run(scenario).logins == 1
+
+
+def test_each_call_has_its_own_timeout(monkeypatch):
+    monkeypatch.setattr(api, "RPC_TIMEOUT", 0.2)
+
+    async def scenario(fake, client):
+        await client.auth.ensure()
+        fake.inject("FileSystemMgmt.getList", ("hang", 5))
+        started = time.perf_counter()
+        with pytest.raises(OMVError):
+            await _fetch_lists(client)
+        return time.perf_counter() - started
+
+    assert _run(scenario) < 1
+
+
+def test_unchanged_response_reuses_decoded_object():
+    async def scenario(fake, client):
+        first = await client.get_list("DiskMgmt")
+        second = await client.get_list("DiskMgmt")
+        fake.disks[0]["temperature"] = "55"
+        third = await client.get_list("DiskMgmt")
+        return first, second, third, client.stats.counters["unchanged_responses"]
+
+    async def login_first(fake, client):
+        await client.auth.ensure()
+        return await scenario(fake, client)
+
+    first, second, third, unchanged = _run(login_first)
+
+    assert second is first
+    assert third is not first
+    assert third[0]["temperature"] == "55"
+    assert unchanged == 1
+
+
+def test_paged_list_fetches_remaining_pages_concurrently():
+    async def scenario(fake, client):
+        client.page_size = 10
+        await client.auth.ensure()
+        fake.latency = {"DiskMgmt.getList": 0.1}
+        rows = await client.get_list("DiskMgmt")
+        return fake, rows
+
+    fake, rows = _run(scenario, disks=45)
+
+    assert [row["devicename"] for row in rows] == [f"sd{index}" for index in range(45)]
+    assert fake.calls["DiskMgmt.getList"] == 5
+    # Première page, puis les 4 autres en parallèle
+    assert fake.max_in_flight == 4
+
+
+def test_unchanged_pages_return_the_same_list():
+    async def scenario(fake, client):
+        client.page_size = 4
+        await client.auth.ensure()
+        first = await client.get_list("DiskMgmt")
+        second = await client.get_list("DiskMgmt")
+        fake.disks[9]["temperature"] = "60"
+        third = await client.get_list("DiskMgmt")
+        return first, second, third
+
+    first, second, third = _run(scenario, disks=10)
+
+    assert second is first
+    assert third is not first
+    assert third[9]["temperature"] == "60"
@@ -0,0 +1,127 @@
+from custom_components.openmediavault.omv import (
+    DiskMerger,
+    FilesystemIndex,
+    _normalize_identifier,
+    merge_disks_with_filesystems,
+)
+
+
+def test_partition_matched_through_parentdevicefile():
+    disks = [{"devicename": "sda", "canonicaldevicefile": "/dev/sda", "size": "1000"}]
+    filesystems = [
+        {"devicename": "sdb1", "parentdevicefile": "/dev/sdb", "size": "10"},
+        {
+            "devicename": "sda1",
+            "parentdevicefile": "/dev/sda",
+            "size": "900",
+            "available": "300",
+            "uuid": "ABCD-1234",
+        },
+    ]
+
+    disk = merge_disks_with_filesystems(disks, filesystems)[0]
+
+    assert disk["size_bytes"] == 900
+    assert disk["used_bytes"] == 600
+    assert disk["disk_id"] == "abcd-1234"
+
+
+def test_parent_name_suffix_matches_by_devicename():
+    disk = {"devicename": "sdc"}
+    fs = {"devicename": "sdc1", "parentdevicefile": "/dev/disk/by-path/sdc"}
+
+    assert FilesystemIndex([fs]).match(disk) is fs
+
+
+def test_parent_name_suffix_matches_a_slashed_devicename():
+    other = {"devicename": "c1d0p1", "parentdevicefile": "/dev/cciss/c1d0"}
+    fs = {"devicename": "c0d0p1", "parentdevicefile": "/dev/cciss/c0d0"}
+    index = FilesystemIndex([other, fs])
+
+    assert index.match({"devicename": "cciss/c0d0"}) is fs
+    assert index.match({"devicename": "c0d0"}) is fs
+    # Pas de « / » devant : « ss/c0d0 » ne termine pas « /dev/cciss/c0d0 »
+    assert index.match({"devicename": "ss/c0d0"}) is None
+
+
+def test_first_matching_filesystem_wins_across_predicates():
+    disk = {"devicename": "sda", "canonicaldevicefile": "/dev/sda"}
+    by_parent = {"parentdevicefile": "/dev/sda", "label": "first"}
+    by_name = {"devicename": "sda", "label": "second"}
+
+    assert FilesystemIndex([by_parent, by_name]).match(disk) is by_parent
+    assert FilesystemIndex([by_name, by_parent]).match(disk) is by_name
+
+
+def test_nvme_names_do_not_collide():
+    disks = [
+        {"devicename": "nvme0n1", "canonicaldevicefile": "/dev/nvme0n1"},
+        {"devicename": "nvme1n1", "canonicaldevicefile": "/dev/nvme1n1"},
+    ]
+    filesystems = [
+        {"devicename": "nvme1n1p1", "parentdevicefile": "/dev/nvme1n1", "size": "2"},
+        {"devicename": "nvme0n1p1", "parentdevicefile": "/dev/nvme0n1", "size": "1"},
+    ]
+
+    merged = merge_disks_with_filesystems(disks, filesystems)
+
+    assert [disk["size_bytes"] for disk in merged] == [1, 2]
+
+
+def test_partition_devicefile_fallback():
+    index = FilesystemIndex(
+        [
+            {"devicefile": "/dev/mmcblk0p2", "label": "emmc"},
+            {"devicefile": "/dev/sdb1", "label": "sdb"},
+        ]
+    )
+
+    assert index.match({"devicename": "sdb", "devicefile": "/dev/sdb"})["label"] == "sdb"
+    assert (
+        index.match({"devicename": "mmcblk0", "devicefile": "/dev/mmcblk0"})["label"]
+        == "emmc"
+    )
+    assert index.match({"devicename": "sd", "devicefile": "/dev/sd"}) is None
+
+
+def test_disk_without_filesystem():
+    disks = [
+        {"devicename": "sdd", "devicefile": "/dev/sdd", "serialnumber": "WD 123", "size": 5}
+    ]
+    filesystems = [{"devicename": "sde1", "parentdevicefile": "/dev/sde"}]
+
+    disk = merge_disks_with_filesystems(disks, filesystems)[0]
+
+    assert disk["size_bytes"] == 5
+    assert disk["available_bytes"] is None
+    assert "mountpoint" not in disk
+    assert disk["disk_id"] == "wd_123"
+
+
+def test_normalize_identifier():
+    assert _normalize_identifier("/dev/Disk By Id") == "disk_by_id"
+    assert _normalize_identifier(" WD-Serial.01 ") == "wd-serial_01"
+    assert _normalize_identifier(None) == ""
+
+
+def test_incremental_merger_rebuilds_only_changed_disks():
+    disks = [
+        {"devicename": "sda", "canonicaldevicefile": "/dev/sda", "temperature": "30"},
+        {"devicename": "sdb", "canonicaldevicefile": "/dev/sdb", "temperature": "31"},
+    ]
+    filesystems = [
+        {"devicename": "sda1", "parentdevicefile": "/dev/sda", "size": "10", "available": "4"},
+    ]
+    merger = DiskMerger()
+    first = merger.merge(disks, filesystems)
+
+    updated = [dict(disks[0], temperature="35"), dict(disks[1])]
+    second = merger.merge(updated, filesystems)
+
+    assert second[0] is not first[0]
+    assert second[0].temperature == 35.0
+    assert second[1] is first[1]
+    assert merger.reused == 1
+    assert [record.as_dict() for record in second] == [
+        record.as_dict() for record in merge_disks_with_filesystems(updated, filesystems)
+    ]
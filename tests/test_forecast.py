@@ -0,0 +1,94 @@
+import pytest
+
+from custom_components.openmediavault.forecast import UsageForecaster, UsageHistory
+from custom_components.openmediavault.omv import DiskRecord
+
+GIB = 1024**3
+
+
+def _naive_slope(samples):
+    count = len(samples)
+    mean_t = sum(t for t, _ in samples) / count
+    mean_y = sum(y for _, y in samples) / count
+    covariance = sum((t - mean_t) * (y - mean_y) for t, y in samples)
+    variance = sum((t - mean_t) ** 2 for t, _ in samples)
+    return covariance / variance
+
+
+def test_slope_needs_a_few_samples():
+    history = UsageHistory(capacity=8)
+    history.add(0, 10 * GIB)
+    history.add(600, 11 * GIB)
+
+    assert history.slope() is None
+
+
+def test_ring_buffer_keeps_only_the_latest_samples():
+    history = UsageHistory(capacity=4)
+    for index in range(10):
+        history.add(1_700_000_000 + index * 600, (index % 3) * GIB)
+
+    samples = history.samples()
+    assert len(history) == 4
+    assert [t for t, _ in samples] == [1_700_000_000 + index * 600 for index in range(6, 10)]
+    assert history.slope() == pytest.approx(_naive_slope(samples))
+
+
+def test_running_sums_stay_accurate_over_many_wraps():
+    history = UsageHistory(capacity=16)
+    start = 1_700_000_000
+    for index in range(10_000):
+        history.add(start + index * 600, 2_000 * GIB + index * 5 * GIB + (index % 7) * GIB)
+
+    assert history.slope() == pytest.approx(_naive_slope(history.samples()), rel=1e-9)
+
+
+def test_out_of_order_samples_are_ignored():
+    history = UsageHistory(capacity=4)
+    history.add(100, 1)
+    history.add(100, 2)
+    history.add(50, 3)
+
+    assert history.samples() == [(100, 1)]
+
+
+def test_forecaster_sets_fill_rate_and_time_to_full():
+    forecaster = UsageForecaster(capacity=32)
+    disk = DiskRecord(disk_id="data", used_bytes=0, available_bytes=100 * GIB)
+
+    for hour in range(4):
+        disk.used_bytes = hour * GIB
+        disk.available_bytes = (100 - hour) * GIB
+        changed = forecaster.apply([disk], sampled_at=hour * 3600.0)
+
+    assert changed
+    assert disk.fill_rate == GIB
+    assert disk.hours_to_full == 97.0
+
+
+def test_shrinking_usage_never_fills():
+    forecaster = UsageForecaster()
+    disk = DiskRecord(disk_id="data", available_bytes=50 * GIB)
+
+    for hour in range(4):
+        disk.used_bytes = (10 - hour) * GIB
+        forecaster.apply([disk], sampled_at=hour * 3600.0)
+
+    assert disk.fill_rate == -GIB
+    assert disk.hours_to_full is None
+
+
+def test_history_survives_a_restore():
+    forecaster = UsageForecaster()
+    disk = DiskRecord(disk_id="data", available_bytes=10 * GIB)
+    for hour in range(3):
+        disk.used_bytes = hour * GIB
+        forecaster.apply([disk], sampled_at=hour * 3600.0)
+
+    restored = UsageForecaster()
+    restored.restore(forecaster.as_dict())
+    copy = DiskRecord(disk_id="data", used_bytes=2 * GIB, available_bytes=10 * GIB)
+    restored.apply([copy])
+
+    assert copy.fill_rate == disk.fill_rate
+    assert copy.hours_to_full == disk.hours_to_full
@@ -0,0 +1,126 @@
+import asyncio
+from types import SimpleNamespace
+
+from custom_components.openmediavault import sensor
+from custom_components.openmediavault.const import DOMAIN
+from custom_components.openmediavault.omv import (
+    OMVSnapshot,
+    merge_disks_with_filesystems,
+)
+
+from fake_omv import make_disks, make_filesystems
+
+
+class _Coordinator:
+    """Just enough of the coordinator for the sensor platform."""
+
+    host = "omv.local"
+    last_update_success = True
+    usage_threshold = 0.1
+    temperature_threshold = 1.0
+
+    def __init__(self, count):
+        self.data = None
+        self.listeners = []
+        self.publish(count)
+
+    def publish(self, count, filesystems=None):
+        if filesystems is None:
+            filesystems = count
+        self.data = OMVSnapshot(
+            merge_disks_with_filesystems(make_disks(count), make_filesystems(filesystems))
+        )
+        for listener in list(self.listeners):
+            listener()
+
+    def async_add_listener(self, listener, context=None):
+        self.listeners.append(listener)
+        return lambda: self.listeners.remove(listener)
+
+
+def _setup(coordinator):
+    added = []
+    unloads = []
+    hass = SimpleNamespace(data={DOMAIN: {"entry": coordinator}})
+    entry = SimpleNamespace(entry_id="entry", async_on_unload=unloads.append)
+    asyncio.run(sensor.async_setup_entry(hass, entry, lambda new: added.append(list(new))))
+    return added, unloads
+
+
+# température, taille totale, disponible, occupation, débit et délai de remplissage
+SENSORS_PER_DISK = 6
+
+
+def _disk_entities(batch):
+    return [entity for entity in batch if isinstance(entity, sensor.OMVDiskEntity)]
+
+
+def test_new_disk_adds_only_its_entities():
+    coordinator = _Coordinator(2)
+    added, _ = _setup(coordinator)
+    initial = _disk_entities(added[1])
+    assert len(initial) == 2 * SENSORS_PER_DISK
+
+    batches = len(added)
+    coordinator.publish(2)
+    assert len(added) == batches
+
+    coordinator.publish(3)
+    new = _disk_entities(added[-1])
+    assert len(new) == SENSORS_PER_DISK
+    assert {entity._device_name for entity in new} == {"sd2"}
+
+
+def test_host_device_is_added_before_what_links_to_it():
+    added, _ = _setup(_Coordinator(1))
+
+    assert all(not isinstance(entity, sensor.OMVDiskEntity) for entity in added[0])
+    assert any(isinstance(entity, sensor.OMVSystemSensor) for entity in added[0])
+
+
+def test_removed_disk_becomes_unavailable_and_returns():
+    coordinator = _Coordinator(3)
+    added, unloads = _setup(coordinator)
+    entities = _disk_entities(added[1])
+    last = [entity for entity in entities if entity._device_name == "sd2"]
+
+    coordinator.publish(2)
+    assert all(not entity.available for entity in last)
+    assert all(entity.available for entity in entities if entity not in last)
+
+    coordinator.publish(3)
+    assert all(entity.available for entity in last)
+    # Le disque revenu n'est pas recréé
+    assert len(added) == 2
+
+    for unload in unloads:
+        unload()
+    assert coordinator.listeners == []
+
+
+def test_entities_of_a_disk_share_their_attributes():
+    coordinator = _Coordinator(1)
+    added, _ = _setup(coordinator)
+    entities = _disk_entities(added[1])
+    plain = [
+        entity for entity in entities if not isinstance(entity, sensor.OMVDiskStorageSensor)
+    ]
+
+    assert len({id(entity.extra_state_attributes) for entity in plain}) == 1
+    storage = [entity for entity in entities if isinstance(entity, sensor.OMVDiskStorageSensor)]
+    assert storage[0].extra_state_attributes is storage[1].extra_state_attributes
+
+
+def test_disk_seen_before_its_filesystem_keeps_its_entities():
+    coordinator = _Coordinator(2)
+    added, _ = _setup(coordinator)
+
+    # Le niveau des disques voit sd2 avant celui des systèmes de fichiers
+    coordinator.publish(3, filesystems=2)
+    early = _disk_entities(added[-1])
+    assert early and all(entity.available for entity in early)
+
+    coordinator.publish(3)
+    assert all(entity.available for entity in early)
+    unique_ids = [entity.unique_id for batch in added for entity in _disk_entities(batch)]
+    assert len(unique_ids) == len(set(unique_ids)) == 3 * SENSORS_PER_DISK
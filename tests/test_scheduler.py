@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+from custom_components.openmediavault.scheduler import OMVScheduler
+
+INTERVAL = timedelta(seconds=60)
+
+
+def _next_refresh(scheduler, entry_id, now):
+    return now + scheduler.align(entry_id, INTERVAL, now).total_seconds()
+
+
+def test_single_host_keeps_its_interval():
+    scheduler = OMVScheduler()
+    scheduler.register("a")
+
+    assert scheduler.align("a", INTERVAL, 1234.5) == INTERVAL
+
+
+def test_hosts_polled_together_are_spread_over_the_interval():
+    scheduler = OMVScheduler()
+    entries = [f"nas{index}" for index in range(20)]
+    for entry_id in entries:
+        scheduler.register(entry_id)
+
+    # Tous les NAS terminent leur premier poll au même instant
+    offsets = sorted(_next_refresh(scheduler, entry_id, 1000.0) % 60 for entry_id in entries)
+    gaps = [later - earlier for earlier, later in zip(offsets, offsets[1:])]
+
+    assert len(set(round(offset, 6) for offset in offsets)) == 20
+    assert max(gaps) < 10
+
+
+def test_alignment_converges_and_keeps_cadence():
+    scheduler = OMVScheduler()
+    scheduler.register("a")
+    scheduler.register("b")
+
+    now = 1000.0
+    delays = []
+    for _ in range(3):
+        delay = scheduler.align("b", INTERVAL, now).total_seconds()
+        delays.append(delay)
+        now += delay
+
+    assert all(30 <= delay <= 90 for delay in delays)
+    assert delays[1] == delays[2] == 60
+
+
+def test_freed_slot_is_reused():
+    scheduler = OMVScheduler()
+    for entry_id in ("a", "b", "c"):
+        scheduler.register(entry_id)
+    phase_b = scheduler.phase("b")
+
+    scheduler.unregister("b")
+    scheduler.register("d")
+
+    assert scheduler.phase("d") == phase_b
+    assert scheduler.phase("c") != phase_b
@@ -0,0 +1,89 @@
+import asyncio
+from datetime import timedelta
+
+import aiohttp
+
+from custom_components.openmediavault.api import OMVClient
+from custom_components.openmediavault.omv import parse_system_information
+from custom_components.openmediavault.services import (
+    SERVICES,
+    RPCService,
+    register_service,
+)
+from fake_omv import FakeOMV, make_system_information
+
+
+def _fetch_all(client):
+    return client.fetch_many(
+        (name, lambda service=service: service.fetch(client))
+        for name, service in SERVICES.items()
+    )
+
+
+def test_registry_declares_the_polled_tiers():
+    assert {"disks", "filesystems", "system"} <= SERVICES.keys()
+    assert SERVICES["disks"].parse(None) == []
+
+
+def test_all_services_share_one_concurrent_batch():
+    async def runner():
+        async with FakeOMV(disks=2) as fake:
+            async with aiohttp.ClientSession() as session:
+                client = OMVClient(session, fake.host, "admin", "secret")
+                await client.auth.ensure()
+                fake.latency = {
+                    f"{service.service}.{service.method}": 0.2
+                    for service in SERVICES.values()
+                }
+                results = await _fetch_all(client)
+                return results, fake.max_in_flight
+
+    results, in_flight = asyncio.run(runner())
+
+    assert len(results["disks"]) == 2
+    assert SERVICES["system"].parse(results["system"]).hostname == "omv"
+    # Un seul lot : tous les services sont en cours en même temps
+    assert in_flight == len(SERVICES)
+
+
+def test_registered_service_joins_the_registry():
+    service = RPCService(
+        "certificates",
+        "CertificateMgmt",
+        "getList",
+        "certificate_scan_interval",
+        timedelta(hours=1),
+    )
+    try:
+        assert register_service(service) is service
+        assert SERVICES["certificates"] is service
+    finally:
+        SERVICES.pop("certificates", None)
+
+
+def test_parse_system_information_omv7():
+    info = parse_system_information(make_system_information())
+
+    assert info.load_1 == 0.42
+    assert info.load_15 == 0.3
+    assert info.cpu_usage == 12.3
+    assert info.memory_used == 2059837440
+    assert info.memory_percent == 25.0
+    assert info.uptime == 356400
+
+
+def test_parse_system_information_older_layouts():
+    info = parse_system_information(
+        {
+            "loadAverage": "0.12, 0.10, 0.05",
+            "memTotal": "1000",
+            "memAvailable": "250",
+            "uptime": "4 days 3 hours",
+        }
+    )
+
+    assert (info.load_1, info.load_5, info.load_15) == (0.12, 0.10, 0.05)
+    assert info.memory_used == 750
+    assert info.memory_percent == 75.0
+    assert info.uptime is None
+    assert parse_system_information(None) is None
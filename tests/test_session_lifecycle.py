@@ -0,0 +1,71 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+from aiohttp import web
+
+from custom_components.openmediavault.const import DATA_SESSION
+from custom_components.openmediavault.session import (
+    async_acquire_session,
+    async_release_session,
+)
+
+
+def _open_fds():
+    return len(os.listdir("/proc/self/fd"))
+
+
+async def _start_server():
+    async def rpc(request):
+        return web.json_response({"response": {"data": []}, "error": None})
+
+    app = web.Application()
+    app.router.add_post("/rpc.php", rpc)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/rpc.php"
+
+
+def test_entries_share_one_session():
+    async def scenario():
+        hass = SimpleNamespace(data={})
+        first = async_acquire_session(hass)
+        second = async_acquire_session(hass)
+        assert first is second
+
+        await async_release_session(hass)
+        assert not first.closed
+        await async_release_session(hass)
+        assert first.closed
+        assert DATA_SESSION not in hass.data
+
+    asyncio.run(scenario())
+
+
+def test_reload_loop_keeps_descriptor_count_flat():
+    async def scenario():
+        hass = SimpleNamespace(data={})
+        runner, url = await _start_server()
+
+        async def reload_once():
+            session = async_acquire_session(hass)
+            for _ in range(3):
+                async with session.post(url, json={}) as resp:
+                    await resp.json()
+            await async_release_session(hass)
+            # Laisse le serveur traiter la fermeture des connexions
+            await asyncio.sleep(0.05)
+
+        await reload_once()
+        baseline = _open_fds()
+        for _ in range(25):
+            await reload_once()
+        after = _open_fds()
+
+        await runner.cleanup()
+        assert after <= baseline
+
+    asyncio.run(scenario())
@@ -0,0 +1,136 @@
+import asyncio
+
+import aiohttp
+
+from custom_components.openmediavault import api
+from custom_components.openmediavault.api import OMVClient
+from custom_components.openmediavault.omv import (
+    OMVSnapshot,
+    merge_disks_with_filesystems,
+)
+from custom_components.openmediavault.smart import SmartCollector, parse_smart
+from fake_omv import FakeOMV, make_smart_attributes
+
+
+def _run(scenario, **fake_options):
+    async def runner():
+        async with FakeOMV(**fake_options) as fake:
+            async with aiohttp.ClientSession() as session:
+                client = OMVClient(session, fake.host, "admin", "secret")
+                return await scenario(fake, SmartCollector(client, concurrency=2))
+
+    return asyncio.run(runner())
+
+
+def _snapshot(fake):
+    return OMVSnapshot(merge_disks_with_filesystems(fake.disks, fake.filesystems))
+
+
+def test_parse_smart_reads_tracked_raw_values():
+    record = parse_smart({"overallstatus": "GOOD"}, make_smart_attributes(3))
+
+    assert record.health == "GOOD"
+    assert record.reallocated_sectors == 3
+    assert record.pending_sectors == 0
+    assert record.power_on_hours == 1003
+
+
+def test_parse_smart_without_attributes_keeps_health():
+    record = parse_smart({"overallstatus": "BAD_ATTRIBUTE_NOW"}, None)
+
+    assert record.health == "BAD_ATTRIBUTE_NOW"
+    assert record.power_on_hours is None
+
+
+def test_attribute_reads_are_limited_per_batch():
+    async def scenario(fake, collector):
+        fake.latency = {"Smart.getAttributes": 0.1}
+        changed = await collector.async_collect(_snapshot(fake))
+        return changed, collector, fake
+
+    changed, collector, fake = _run(scenario, disks=6)
+
+    assert changed
+    assert len(collector.records) == 6
+    # 6 disques, jamais plus de 2 lectures en cours
+    assert fake.calls["Smart.getAttributes"] == 6
+    assert fake.max_in_flight == 2
+
+
+def test_standby_disks_are_skipped_and_keep_cached_values():
+    async def scenario(fake, collector):
+        await collector.async_collect(_snapshot(fake))
+        calls = fake.calls["Smart.getAttributes"]
+        fake.disks[1]["powermode"] = "standby"
+        changed = await collector.async_collect(_snapshot(fake))
+        return fake.calls["Smart.getAttributes"] - calls, changed, collector
+
+    new_calls, changed, collector = _run(scenario, disks=3)
+
+    assert new_calls == 2
+    assert not changed
+    assert collector.records["wd-00000001"].power_on_hours == 1001
+    assert collector.stats.counters["smart_wakeups_avoided"] == 1
+
+
+def test_disk_that_times_out_does_not_fail_the_others(monkeypatch):
+    monkeypatch.setattr(api, "RPC_TIMEOUT", 0.2)
+
+    async def scenario(fake, collector):
+        fake.inject("Smart.getAttributes", ("hang", 5))
+        changed = await collector.async_collect(_snapshot(fake))
+        first = dict(collector.records)
+        await collector.async_collect(_snapshot(fake))
+        return changed, first, collector
+
+    changed, first, collector = _run(scenario, disks=3)
+
+    assert changed
+    assert len(first) == 2
+    # Le disque resté muet est relu au passage suivant
+    assert len(collector.records) == 3
+    assert collector.stats.counters["timeouts"] == 1
+
+
+def test_apply_copies_records_onto_disks():
+    async def scenario(fake, collector):
+        await collector.async_collect(_snapshot(fake))
+        snapshot = _snapshot(fake)
+        collector.apply(snapshot)
+        return snapshot
+
+    snapshot = _run(scenario, disks=2)
+
+    disk = snapshot.disks[1]
+    assert disk.smart_health == "GOOD"
+    assert disk.reallocated_sectors == 1
+
+
+def test_new_disk_is_reported_as_unchecked():
+    async def scenario(fake, collector):
+        await collector.async_collect(_snapshot(fake))
+        before = collector.has_unchecked(_snapshot(fake))
+        fake.disks.extend(FakeOMV(disks=3).disks[2:])
+        return before, collector.has_unchecked(_snapshot(fake))
+
+    before, after = _run(scenario, disks=2)
+
+    assert not before
+    assert after
+
+
+def test_swapped_drive_does_not_inherit_smart_values():
+    async def scenario(fake, collector):
+        await collector.async_collect(_snapshot(fake))
+        fake.disks[0]["serialnumber"] = "NEW-DRIVE"
+        swapped = _snapshot(fake)
+        unchecked = collector.has_unchecked(swapped)
+        collector.apply(swapped)
+        return unchecked, swapped
+
+    unchecked, swapped = _run(scenario, disks=2)
+
+    assert unchecked
+    assert swapped.disks[0].smart_health is None
+    assert swapped.disks[0].power_on_hours is None
+    assert swapped.disks[1].power_on_hours == 1001
@@ -0,0 +1,51 @@
+from custom_components.openmediavault.omv import (
+    SpindownTracker,
+    disk_attributes,
+    merge_disks_with_filesystems,
+)
+from fake_omv import make_disks, make_filesystems
+
+
+def _merge(powermode, temperature):
+    disks = make_disks(2)
+    disks[1]["powermode"] = powermode
+    disks[1]["temperature"] = temperature
+    return merge_disks_with_filesystems(disks, make_filesystems(2))
+
+
+def test_standby_disk_keeps_its_last_active_temperature():
+    tracker = SpindownTracker()
+    tracker.apply(_merge("active/idle", "38"))
+
+    merged = _merge("standby", "")
+    tracker.apply(merged)
+
+    asleep = merged[1]
+    assert asleep.temperature == 38.0
+    assert asleep.temperature_cached is True
+    assert tracker.is_sleeping(asleep.hardware_id)
+    # Les disques actifs gardent leur valeur lue
+    assert merged[0].temperature_cached is False
+    assert merged[0].temperature == 30.0
+
+
+def test_woken_disk_reports_fresh_temperature():
+    tracker = SpindownTracker()
+    tracker.apply(_merge("active/idle", "38"))
+    tracker.apply(_merge("standby", ""))
+
+    merged = _merge("active/idle", "41")
+    tracker.apply(merged)
+
+    assert merged[1].temperature == 41.0
+    assert merged[1].temperature_cached is False
+
+
+def test_unknown_power_state_is_not_flagged():
+    tracker = SpindownTracker()
+    merged = merge_disks_with_filesystems(make_disks(1), make_filesystems(1))
+    tracker.apply(merged)
+
+    attributes = disk_attributes(merged[0])
+    assert "power_state" not in attributes
+    assert "wakeups_avoided" not in attributes
@@ -0,0 +1,86 @@
+import asyncio
+
+import aiohttp
+
+from custom_components.openmediavault.api import OMVClient
+from custom_components.openmediavault.services import SERVICES
+from custom_components.openmediavault.throughput import (
+    COUNTER_32_MAX,
+    CounterRates,
+    build_interfaces,
+    counter_delta,
+    parse_interface_counters,
+)
+from fake_omv import FakeOMV, make_interfaces
+
+
+def test_counter_delta_handles_wrap_and_reset():
+    assert counter_delta(100, 250) == 150
+    # Compteur 32 bits repassé par zéro
+    assert counter_delta(COUNTER_32_MAX - 10, 5) == 15
+    # Remise à zéro : pas de débit plutôt qu'un pic absurde
+    assert counter_delta(1_000_000, 10) is None
+    assert counter_delta(COUNTER_32_MAX * 4, 10) is None
+
+
+def test_rates_need_two_reads():
+    rates = CounterRates()
+
+    assert rates.sample({"eth0": (1000, 0)}, 10.0) is True
+    assert rates.rates == {"eth0": (None, None)}
+    assert rates.sample({"eth0": (3000, 500)}, 12.0) is True
+    assert rates.rates == {"eth0": (1000.0, 250.0)}
+    # Compteurs figés : débit nul, et non plus le dernier débit
+    assert rates.sample({"eth0": (3000, 500)}, 14.0) is True
+    assert rates.rates == {"eth0": (0.0, 0.0)}
+    assert rates.sample({"eth0": (3000, 500)}, 16.0) is False
+
+
+def test_reset_skips_one_read_then_recovers():
+    rates = CounterRates()
+    rates.sample({"eth0": (5_000_000, 0)}, 0.0)
+    rates.sample({"eth0": (100, 0)}, 10.0)
+    assert rates.rates["eth0"][0] is None
+    rates.sample({"eth0": (1100, 0)}, 20.0)
+    assert rates.rates["eth0"][0] == 100.0
+
+
+def test_removed_device_is_forgotten():
+    rates = CounterRates()
+    rates.sample({"sda": (0, 0), "sdb": (0, 0)}, 0.0)
+    rates.sample({"sda": (10, 10)}, 1.0)
+    assert set(rates.rates) == {"sda"}
+
+
+def test_interface_counters_skip_loopback():
+    rows = make_interfaces(rx_bytes="123", tx_bytes=456)
+    rows.append({"devicename": "eth1", "rx_bytes": 7, "tx_bytes": 8})
+
+    assert parse_interface_counters(rows) == {"eth0": (123, 456), "eth1": (7, 8)}
+    assert parse_interface_counters(None) == {}
+
+
+def test_one_call_reads_every_interface():
+    async def runner():
+        async with FakeOMV(disks=24) as fake:
+            fake.interfaces = make_interfaces(rx_bytes=1000) + [
+                {"devicename": f"eth{index}", "stats": {"rx_bytes": 0, "tx_bytes": 0}}
+                for index in range(1, 4)
+            ]
+            async with aiohttp.ClientSession() as session:
+                client = OMVClient(session, fake.host, "admin", "secret")
+                await client.auth.ensure()
+                result = await SERVICES["network"].fetch(client)
+            return result, fake.calls
+
+    result, calls = asyncio.run(runner())
+
+    rates = CounterRates()
+    rates.sample(SERVICES["network"].parse(result), 0.0)
+    assert [interface.name for interface in build_interfaces(rates.rates)] == [
+        "eth0",
+        "eth1",
+        "eth2",
+        "eth3",
+    ]
+    assert calls["Network.enumerateDevices"] == 1